@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+bench_chunker.py
+Compare the character-window chunker with the structure-aware markdown chunker:
+throughput, chunk counts, token sizes and how often a chunk boundary cuts
+through a word or a table.
+
+Usage:
+  python scripts/bench_chunker.py                      # synthetic Docling-style markdown
+  python scripts/bench_chunker.py --input doc.md --repeat 20
+  python scripts/bench_chunker.py --max-tokens 256 --size 1000 --overlap 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.mcpws.rag.chunking import (
+    Chunker,
+    MarkdownChunker,
+    char_chunker,
+    count_tokens,
+)
+
+
+def synthetic_markdown(sections: int = 200) -> str:
+    parts: List[str] = []
+    for s in range(sections):
+        parts.append(f"## Section {s}\n")
+        for p in range(3):
+            sentence = f"Clause {s}.{p} covers renewal windows, notice periods and fees. "
+            parts.append(sentence * (4 + (s + p) % 5) + "\n")
+        if s % 3 == 0:
+            rows = "\n".join(f"| item {r} | {r * 10} | net {30 + r} |" for r in range(6))
+            parts.append("| item | amount | terms |\n|------|--------|-------|\n" + rows + "\n")
+    return "\n".join(parts)
+
+
+def _cuts(text: str, chunks: List[str]) -> Dict[str, int]:
+    """Count chunk ends that fall inside a word or inside a table row block."""
+    words = tables = 0
+    pos = 0
+    for c in chunks:
+        start = text.find(c, pos)
+        if start < 0:
+            continue
+        end = start + len(c)
+        if 0 < end < len(text) and text[end - 1].isalnum() and text[end].isalnum():
+            words += 1
+        line_start = text.rfind("\n", 0, end) + 1
+        next_nl = text.find("\n", end)
+        next_line = text[next_nl + 1 : next_nl + 2] if next_nl >= 0 else ""
+        if text[line_start : line_start + 1] == "|" and next_line == "|":
+            tables += 1
+        pos = start + 1
+    return {"word_cuts": words, "table_cuts": tables}
+
+
+def bench(name: str, chunk: Chunker, text: str, repeat: int) -> Dict[str, object]:
+    timings: List[float] = []
+    chunks: List[str] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        chunks = list(chunk(text))
+        timings.append(time.perf_counter() - t0)
+    best = min(timings)
+    sizes = [count_tokens(c) for c in chunks]
+    return {
+        "chunker": name,
+        "MB/s": round(len(text.encode("utf-8")) / best / 1e6, 1),
+        "chunks": len(chunks),
+        "avg_tokens": round(statistics.mean(sizes), 1) if sizes else 0,
+        "max_tokens": max(sizes, default=0),
+        "total_tokens": sum(sizes),
+        **_cuts(text, chunks),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--input", help="markdown file (default: synthetic document)")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--size", type=int, default=1000, help="chars chunker: window size")
+    ap.add_argument("--overlap", type=int, default=200, help="chars chunker: overlap")
+    ap.add_argument("--max-tokens", type=int, default=256)
+    ap.add_argument("--overlap-tokens", type=int, default=32)
+    args = ap.parse_args()
+
+    text = Path(args.input).read_text(encoding="utf-8") if args.input else synthetic_markdown()
+    rows = [
+        bench("chars", char_chunker(args.size, args.overlap), text, args.repeat),
+        bench(
+            "markdown",
+            MarkdownChunker(max_tokens=args.max_tokens, overlap_tokens=args.overlap_tokens),
+            text,
+            args.repeat,
+        ),
+    ]
+    print(f"input: {len(text):,} chars, {count_tokens(text):,} tokens (approx.)")
+    cols = list(rows[0])
+    print("  ".join(f"{c:>12}" for c in cols))
+    for row in rows:
+        print("  ".join(f"{row[c]!s:>12}" for c in cols))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
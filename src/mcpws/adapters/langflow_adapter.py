@@ -1,15 +1,62 @@
 import os
 import time
-from typing import Any, Dict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
 
-import requests  # type: ignore[import-untyped]
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from ..utils.logging import get_logger, correlation_id
+from ..servers.catalog import catalog_response
+from .coalesce import SingleFlight, TTLCache, payload_key
+from .upstream import Upstream, UpstreamBusy
 
 LOG = get_logger("langflow-adapter")
-app = FastAPI(title="Langflow MCP Adapter", version="0.1.0")
+
+LANGFLOW_URL = os.environ.get("LANGFLOW_URL", "http://localhost:7860/api/v1/run/REPLACE_FLOW_ID")
+TIMEOUT = int(os.environ.get("TIMEOUT", "60"))
+# Upstream connection pool and per-upstream limit on concurrent Langflow calls
+UPSTREAM_POOL_SIZE = int(os.environ.get("UPSTREAM_POOL_SIZE", "100"))
+UPSTREAM_CONCURRENCY = int(os.environ.get("UPSTREAM_CONCURRENCY", "64"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get("UPSTREAM_CONNECT_TIMEOUT", "5"))
+UPSTREAM_QUEUE_TIMEOUT = float(os.environ.get("UPSTREAM_QUEUE_TIMEOUT", str(TIMEOUT)))
+# Identical concurrent summaries share one Langflow call; finished ones can be
+# cached for SUMMARY_CACHE_TTL_S seconds (0 = no cache)
+SINGLE_FLIGHT = bool(int(os.environ.get("SINGLE_FLIGHT", "1")))
+SUMMARY_CACHE_TTL_S = float(os.environ.get("SUMMARY_CACHE_TTL_S", "0"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get("SUMMARY_CACHE_MAX_ENTRIES", "1024"))
+
+_upstreams: Dict[str, Upstream] = {}
+_flights: SingleFlight[Dict[str, Any]] = SingleFlight()
+summary_cache: Optional[TTLCache[Dict[str, Any]]] = (
+    TTLCache(SUMMARY_CACHE_TTL_S, SUMMARY_CACHE_MAX_ENTRIES) if SUMMARY_CACHE_TTL_S > 0 else None
+)
+
+
+def _upstream(url: str = LANGFLOW_URL) -> Upstream:
+    """Shared client per upstream URL (created on first use)."""
+    up = _upstreams.get(url)
+    if up is None:
+        up = _upstreams[url] = Upstream(
+            url,
+            concurrency=UPSTREAM_CONCURRENCY,
+            pool_size=UPSTREAM_POOL_SIZE,
+            timeout_s=TIMEOUT,
+            connect_timeout_s=UPSTREAM_CONNECT_TIMEOUT,
+            queue_timeout_s=UPSTREAM_QUEUE_TIMEOUT,
+        )
+    return up
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    yield
+    for up in list(_upstreams.values()):
+        await up.aclose()
+    _upstreams.clear()
+
+
+app = FastAPI(title="Langflow MCP Adapter", version="0.1.0", lifespan=_lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,9 +65,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-LANGFLOW_URL = os.environ.get("LANGFLOW_URL", "http://localhost:7860/api/v1/run/REPLACE_FLOW_ID")
-TIMEOUT = int(os.environ.get("TIMEOUT", "60"))
-
 
 @app.get("/health")
 def health() -> Dict[str, str]:
@@ -28,43 +72,76 @@ def health() -> Dict[str, str]:
 
 
 @app.get("/tools")
-def tools() -> Dict[str, Any]:
+def tools(request: Request) -> Response:
     # Advertise a single summarizer tool with simple JSON schema
+    return catalog_response(
+        request,
+        {
+            "tools": [
+                {
+                    "name": "lf.summarize",
+                    "description": "Summarize input text using a Langflow flow",
+                    "schema": {
+                        "type": "object",
+                        "properties": {"text": {"type": "string"}},
+                        "required": ["text"],
+                    },
+                }
+            ]
+        },
+    )
+
+
+@app.get("/metrics")
+def metrics() -> Dict[str, Any]:
+    return {
+        "upstreams": {url: up.stats() for url, up in _upstreams.items()},
+        "single_flight": _flights.stats() if SINGLE_FLIGHT else None,
+        "summary_cache": summary_cache.stats() if summary_cache is not None else None,
+    }
+
+
+async def _summarize(text: str) -> Dict[str, Any]:
+    data = await _upstream().post_json({"text": text})
+    # normalize common fields
     return {
-        "tools": [
-            {
-                "name": "lf.summarize",
-                "description": "Summarize input text using a Langflow flow",
-                "schema": {
-                    "type": "object",
-                    "properties": {"text": {"type": "string"}},
-                    "required": ["text"],
-                },
-            }
-        ]
+        "summary": data.get("summary") or data.get("output") or data.get("result") or "",
+        "tokens": data.get("usage", {}).get("total_tokens", 0),
     }
 
 
 @app.post("/call/lf.summarize")
-def call_summarize(payload: Dict[str, Any]) -> Dict[str, Any]:
+async def call_summarize(payload: Dict[str, Any]) -> Dict[str, Any]:
     if "text" not in payload or not isinstance(payload.get("text"), str):
         raise HTTPException(status_code=400, detail="payload requires a 'text' string")
     cid = correlation_id()
     t0 = time.time()
+    text = payload["text"]
+    key = payload_key(LANGFLOW_URL, {"text": text})
     try:
-        r = requests.post(LANGFLOW_URL, json={"text": payload["text"]}, timeout=TIMEOUT)
-        r.raise_for_status()
-        data = r.json()
-        # normalize common fields
-        result = {
-            "summary": data.get("summary") or data.get("output") or data.get("result") or "",
-            "tokens": data.get("usage", {}).get("total_tokens", 0),
-        }
+        cached = summary_cache.get(key) if summary_cache is not None else None
+        if cached is not None:
+            result = cached
+        elif SINGLE_FLIGHT:
+            result = await _flights.do(key, lambda: _summarize(text))
+        else:
+            result = await _summarize(text)
+        if summary_cache is not None and cached is None:
+            summary_cache.put(key, result)
         LOG.info(
             "lf.summarize.ok",
-            extra={"extra": {"cid": cid, "latency_ms": int(1000 * (time.time() - t0))}},
+            extra={
+                "extra": {
+                    "cid": cid,
+                    "cached": cached is not None,
+                    "latency_ms": int(1000 * (time.time() - t0)),
+                }
+            },
         )
-        return result
-    except Exception as e:  # pragma: no cover - network path
+        return dict(result)
+    except UpstreamBusy as e:
+        LOG.error("lf.summarize.busy", extra={"extra": {"cid": cid, "error": str(e)}})
+        raise HTTPException(status_code=503, detail=f"Langflow busy: {e}")
+    except Exception as e:
         LOG.error("lf.summarize.err", extra={"extra": {"cid": cid, "error": str(e)}})
         raise HTTPException(status_code=502, detail=f"Langflow call failed: {e}")
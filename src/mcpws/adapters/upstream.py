@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+class UpstreamBusy(Exception):
+    """No concurrency slot freed up within the queue timeout."""
+
+
+class Upstream:
+    """Pooled async HTTP client for one upstream, with a concurrency limit.
+
+    At most `concurrency` requests are in flight; the rest wait for a slot (up
+    to `queue_timeout_s`). `stats()` reports in-flight/queued counts and the
+    time requests spent waiting, so saturation shows up before timeouts do.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        concurrency: int = 64,
+        pool_size: int = 100,
+        timeout_s: float = 60.0,
+        connect_timeout_s: float = 5.0,
+        queue_timeout_s: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.url = url
+        self.concurrency = max(1, concurrency)
+        self.queue_timeout_s = queue_timeout_s
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout_s, connect=connect_timeout_s),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=transport,
+        )
+        self._sem = asyncio.Semaphore(self.concurrency)
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    async def post_json(self, payload: Dict[str, Any]) -> Any:
+        """POST `payload` to the upstream URL and return the decoded JSON body."""
+        t0 = time.perf_counter()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise UpstreamBusy(f"no upstream slot within {self.queue_timeout_s}s") from None
+        finally:
+            self.queued -= 1
+        waited = (time.perf_counter() - t0) * 1000.0
+        self.wait_ms_total += waited
+        self.wait_ms_max = max(self.wait_ms_max, waited)
+        self.in_flight += 1
+        ok = False
+        try:
+            r = await self.client.post(self.url, json=payload)
+            r.raise_for_status()
+            data = r.json()
+            ok = True
+            return data
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.failed += 0 if ok else 1
+            self._sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.completed
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": done,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_queue_ms": round(self.wait_ms_total / done, 2) if done else 0.0,
+            "max_queue_ms": round(self.wait_ms_max, 2),
+        }
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,11 @@
+# File: src/mcpws/rag/__init__.py
+"""
+RAG package
+-----------
+Building blocks for the Docling RAG server (conversion workers, ingestion
+pipeline, etc.). Kept free of heavy imports so they stay cheap to load and test.
+"""
+
+from __future__ import annotations
+
+__all__ = []
@@ -0,0 +1,165 @@
+# File: src/mcpws/rag/answer_cache.py
+"""
+Answer cache
+------------
+In-memory cache of generated answers for `docling.query`. An entry is keyed
+on the exact set of retrieved chunk ids plus the query embedding: a lookup
+hits when retrieval returned the same chunks and the cosine similarity of the
+two query vectors is at least `threshold`, so rephrasings of a question share
+one answer while anything that changes the context misses.
+
+Chunk ids are content-addressed, so edited text already produces new ids. For
+everything else (metadata-only updates, deletes, purges) the ingestion writers
+call `invalidate`/`invalidate_source`, which drop every entry that used one of
+the affected chunks. Each invalidation also bumps an epoch; an answer computed
+from a retrieval that started before the bump is not stored.
+
+Bounded by `max_entries` (LRU) and an optional `ttl_s`. Safe to share between
+threads.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    sources: List[Dict[str, Any]]
+    similarity: float = 1.0
+
+
+@dataclass
+class _Entry:
+    qvec: List[float]
+    ids: FrozenSet[str]
+    answer: str
+    sources: List[Dict[str, Any]]
+    created: float = field(default_factory=time.time)
+
+
+def _normalize(vec: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+class AnswerCache:
+    def __init__(self, threshold: float = 0.95, max_entries: int = 2048, ttl_s: float = 0.0):
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._next = 0
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._by_ids: Dict[FrozenSet[str], Set[int]] = {}
+        self._by_chunk: Dict[str, Set[int]] = {}
+
+    def epoch(self) -> int:
+        """Take before retrieval and pass to `put`, so stale answers are dropped."""
+        return self._epoch
+
+    def get(self, qvec: Sequence[float], ids: Iterable[str]) -> Optional[CachedAnswer]:
+        key = frozenset(ids)
+        q = _normalize(qvec)
+        now = time.time()
+        with self._lock:
+            best: Optional[int] = None
+            best_sim = self.threshold
+            for eid in list(self._by_ids.get(key, ())):
+                entry = self._entries[eid]
+                if self.ttl_s and now - entry.created > self.ttl_s:
+                    self._drop(eid)
+                    continue
+                if len(entry.qvec) != len(q):
+                    continue
+                sim = sum(a * b for a, b in zip(entry.qvec, q))
+                if sim >= best_sim:
+                    best, best_sim = eid, sim
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best)
+            entry = self._entries[best]
+            return CachedAnswer(entry.answer, [dict(s) for s in entry.sources], round(best_sim, 4))
+
+    def put(
+        self,
+        qvec: Sequence[float],
+        ids: Iterable[str],
+        answer: str,
+        sources: List[Dict[str, Any]],
+        *,
+        epoch: Optional[int] = None,
+    ) -> bool:
+        key = frozenset(ids)
+        with self._lock:
+            if not key or (epoch is not None and epoch != self._epoch):
+                return False
+            eid = self._next
+            self._next += 1
+            self._entries[eid] = _Entry(_normalize(qvec), key, answer, [dict(s) for s in sources])
+            self._by_ids.setdefault(key, set()).add(eid)
+            for cid in key:
+                self._by_chunk.setdefault(cid, set()).add(eid)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, ids: Iterable[str]) -> int:
+        """Drop every entry whose context included one of `ids`."""
+        with self._lock:
+            self._epoch += 1
+            doomed: Set[int] = set()
+            for cid in ids:
+                doomed.update(self._by_chunk.get(cid, ()))
+            for eid in doomed:
+                self._drop(eid)
+            self.invalidations += len(doomed)
+            return len(doomed)
+
+    def invalidate_source(self, source: str) -> int:
+        prefix = f"{source}:"
+        with self._lock:
+            ids = [cid for cid in self._by_chunk if cid.startswith(prefix)]
+        return self.invalidate(ids)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop(self, eid: int) -> None:
+        entry = self._entries.pop(eid, None)
+        if entry is None:
+            return
+        group = self._by_ids.get(entry.ids)
+        if group is not None:
+            group.discard(eid)
+            if not group:
+                del self._by_ids[entry.ids]
+        for cid in entry.ids:
+            users = self._by_chunk.get(cid)
+            if users is not None:
+                users.discard(eid)
+                if not users:
+                    del self._by_chunk[cid]
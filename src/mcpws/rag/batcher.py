@@ -0,0 +1,109 @@
+# File: src/mcpws/rag/batcher.py
+"""
+Embedding micro-batcher
+-----------------------
+Coalesces concurrent single-text embedding requests (one per `docling.query`)
+into one backend call. The first request opens a batch; it is flushed when it
+reaches `max_batch` texts or `max_wait_ms` after it was opened, whichever
+comes first. Each caller gets back its own vector.
+
+Identical texts in the same batch are embedded once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+EmbedFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+_Item = Tuple[str, float, "asyncio.Future[List[float]]"]
+
+
+class EmbeddingBatcher:
+    def __init__(self, embed: EmbedFn, max_batch: int = 32, max_wait_ms: float = 5.0) -> None:
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._embed = embed
+        self._queue: Optional["asyncio.Queue[_Item]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._collector: Optional["asyncio.Task[None]"] = None
+        self._inflight: "set[asyncio.Task[None]]" = set()
+        # metrics
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    async def embed(self, text: str) -> List[float]:
+        queue = self._ensure_started()
+        fut: "asyncio.Future[List[float]]" = asyncio.get_running_loop().create_future()
+        queue.put_nowait((text, time.perf_counter(), fut))
+        return await fut
+
+    async def stop(self) -> None:
+        if self._collector is not None:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+        self._collector = None
+        self._queue = None
+        self._loop = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "avg_queue_ms": round(self.wait_ms_total / self.items, 2) if self.items else 0.0,
+            "max_queue_ms": round(self.wait_ms_max, 2),
+        }
+
+    def _ensure_started(self) -> "asyncio.Queue[_Item]":
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect(self._queue))
+        return self._queue
+
+    async def _collect(self, queue: "asyncio.Queue[_Item]") -> None:
+        while True:
+            batch = [await queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Run the batch concurrently so the next window can fill meanwhile.
+            task = asyncio.create_task(self._flush(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        now = time.perf_counter()
+        for _, enqueued, _ in batch:
+            waited = (now - enqueued) * 1000.0
+            self.wait_ms_total += waited
+            self.wait_ms_max = max(self.wait_ms_max, waited)
+        self.batches += 1
+        self.items += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        try:
+            vecs = dict(zip(texts, await self._embed(texts)))
+        except Exception as e:
+            for _, _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for text, _, fut in batch:
+            if not fut.done():
+                fut.set_result(vecs[text])
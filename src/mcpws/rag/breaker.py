@@ -0,0 +1,182 @@
+# File: src/mcpws/rag/breaker.py
+"""
+Circuit breaker
+---------------
+Keeps requests from waiting on a dependency that is known to be failing
+(watsonx embedding/generation). States:
+
+  - closed:    calls go through; `failure_threshold` consecutive failures open it
+  - open:      calls are refused (callers use their fallback right away) until
+               `reset_timeout_s` has passed
+  - half_open: one trial call (a health probe, or the next real request) is let
+               through; success closes the breaker, failure re-opens it
+
+`call` wraps a blocking function with a timeout and a bounded number of
+retries. Retries are also limited by a `RetryBudget` shared by all callers,
+so a struggling dependency is not hit with a multiple of normal traffic.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class RetryBudget:
+    """Every call earns `ratio` of a retry token; every retry spends one."""
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 3.0, max_tokens: float = 20.0):
+        self.ratio = ratio
+        self.max_tokens = max(min_tokens, max_tokens)
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 3,
+        reset_timeout_s: float = 30.0,
+        timeout_s: float = 10.0,
+        retries: int = 1,
+        budget: Optional[RetryBudget] = None,
+        max_workers: int = 8,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self.timeout_s = timeout_s
+        self.retries = max(0, retries)
+        self.budget = budget or RetryBudget()
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self.calls = 0
+        self.rejected = 0
+        self.failures_total = 0
+        self.timeouts = 0
+        self.retried = 0
+        self.opened = 0
+        # Calls run here so a hung request can be abandoned after `timeout_s`.
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix=f"{name}-call-"
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go out now (takes the single trial slot when half-open)."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_s:
+                self._state = HALF_OPEN
+                self._trial = False
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            self.rejected += 1
+            return False
+
+    def probe_due(self) -> bool:
+        with self._lock:
+            if self._state == OPEN:
+                return time.monotonic() - self._opened_at >= self.reset_timeout_s
+            return self._state == HALF_OPEN and not self._trial
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures_total += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn` with the timeout/retry policy; raises `CircuitOpenError` when refused."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        self.calls += 1
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                result = self._pool.submit(fn, *args, **kwargs).result(timeout=self.timeout_s)
+            except Exception as e:
+                timed_out = isinstance(e, FutureTimeout)
+                if timed_out:
+                    self.timeouts += 1
+                self.record_failure()
+                retry = attempt < self.retries and self.state == CLOSED and self.budget.withdraw()
+                if not retry:
+                    if timed_out:
+                        raise TimeoutError(
+                            f"{self.name} call timed out after {self.timeout_s}s"
+                        ) from e
+                    raise
+                attempt += 1
+                self.retried += 1
+                continue
+            self.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "calls": self.calls,
+                "rejected": self.rejected,
+                "failures": self.failures_total,
+                "timeouts": self.timeouts,
+                "retries": self.retried,
+                "opened": self.opened,
+                "retry_tokens": round(self.budget.tokens, 2),
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
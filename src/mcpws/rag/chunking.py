@@ -0,0 +1,227 @@
+# File: src/mcpws/rag/chunking.py
+"""
+Chunking
+--------
+Chunkers turn converted markdown into retrieval passages. A chunker is any
+callable `text -> Iterable[str]`; the server picks one with `make_chunker`.
+
+  - `char_chunker`: fixed character windows with overlap (the original scheme)
+  - `MarkdownChunker`: splits along Docling's markdown structure (headings,
+    paragraphs, tables, code fences) and packs whole blocks into chunks of at
+    most `max_tokens` tokens. A heading starts a new chunk once the current one
+    holds `min_tokens`, a block larger than the budget is split on line and
+    then word boundaries, and consecutive budget-limited chunks share up to
+    `overlap_tokens` worth of trailing blocks.
+
+`MarkdownChunker` makes one pass over the text: blocks are recorded as
+`(start, end)` offsets, token counts are taken on those spans, and each chunk
+is produced by a single slice of the original string.
+
+Token counts come from a `TokenCounter(text, start, end)`. The default
+(`count_tokens`) approximates a subword tokenizer by counting words and
+punctuation; `hf_token_counter` uses a Hugging Face tokenizer instead.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+Chunker = Callable[[str], Iterable[str]]
+TokenCounter = Callable[[str, int, int], int]
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_WORD = re.compile(r"\S+")
+_BLANK = re.compile(r"[ \t\r]*$")
+_HEADING = re.compile(r" {0,3}#{1,6}(?:[ \t]|$)")
+_FENCE = re.compile(r" {0,3}(```|~~~)")
+_TABLE = re.compile(r"[ \t]*\|")
+
+_Block = Tuple[int, int, int, bool]  # start, end, tokens, is_heading
+
+
+def count_tokens(text: str, start: int = 0, end: Optional[int] = None) -> int:
+    end = len(text) if end is None else end
+    return len(_TOKEN.findall(text, start, end))
+
+
+def hf_token_counter(name: str) -> TokenCounter:
+    """Exact counts from a Hugging Face tokenizer (`transformers` required)."""
+    from transformers import AutoTokenizer  # type: ignore[import-not-found]
+
+    tokenizer = AutoTokenizer.from_pretrained(name)
+
+    def count(text: str, start: int, end: int) -> int:
+        return len(tokenizer(text[start:end], add_special_tokens=False)["input_ids"])
+
+    return count
+
+
+def char_chunker(size: int, overlap: int) -> Chunker:
+    def chunk(text: str) -> Iterator[str]:
+        if size <= 0:
+            yield text
+            return
+        start = 0
+        n = len(text)
+        while start < n:
+            end = min(n, start + size)
+            yield text[start:end]
+            start = end - overlap if (end - overlap) > start else end
+
+    return chunk
+
+
+class MarkdownChunker:
+    def __init__(
+        self,
+        max_tokens: int = 256,
+        overlap_tokens: int = 32,
+        min_tokens: Optional[int] = None,
+        count: TokenCounter = count_tokens,
+    ) -> None:
+        self.max_tokens = max(1, max_tokens)
+        self.overlap_tokens = max(0, min(overlap_tokens, self.max_tokens // 2))
+        self.min_tokens = self.max_tokens // 4 if min_tokens is None else min_tokens
+        self.count = count
+
+    def __call__(self, text: str) -> Iterator[str]:
+        current: List[_Block] = []
+        tokens = 0
+        for block in self._blocks(text):
+            start, end, size, heading = block
+            if size > self.max_tokens:
+                if current:
+                    yield text[current[0][0] : current[-1][1]]
+                    current, tokens = [], 0
+                for lo, hi in self._split(text, start, end):
+                    yield text[lo:hi]
+                continue
+            if current and heading and tokens >= self.min_tokens:
+                yield text[current[0][0] : current[-1][1]]
+                current, tokens = [], 0
+            elif current and tokens + size > self.max_tokens:
+                yield text[current[0][0] : current[-1][1]]
+                current, tokens = self._overlap(current, size)
+            current.append(block)
+            tokens += size
+        if current:
+            yield text[current[0][0] : current[-1][1]]
+
+    def _overlap(self, previous: List[_Block], incoming: int) -> Tuple[List[_Block], int]:
+        """Trailing blocks of `previous` to repeat in the next chunk."""
+        budget = min(self.overlap_tokens, self.max_tokens - incoming)
+        kept: List[_Block] = []
+        total = 0
+        for block in reversed(previous[1:]):
+            if block[3] or total + block[2] > budget:
+                break
+            kept.append(block)
+            total += block[2]
+        kept.reverse()
+        return kept, total
+
+    def _blocks(self, text: str) -> Iterator[_Block]:
+        n = len(text)
+        pos = 0
+        start = -1  # start of the open paragraph/table, if any
+        table = False
+
+        def close(end: int) -> Iterator[_Block]:
+            nonlocal start
+            if start >= 0:
+                yield (start, end, self.count(text, start, end), False)
+                start = -1
+
+        last_end = 0
+        while pos < n:
+            eol = text.find("\n", pos)
+            eol = n if eol < 0 else eol
+            if _BLANK.match(text, pos, eol):
+                yield from close(last_end)
+            elif _FENCE.match(text, pos, eol):
+                yield from close(last_end)
+                marker = text[pos:eol].lstrip()[:3]
+                end = text.find("\n" + marker, eol)
+                end = n if end < 0 else text.find("\n", end + 1)
+                end = n if end < 0 else end
+                yield (pos, end, self.count(text, pos, end), False)
+                last_end, pos = end, end + 1
+                continue
+            elif _HEADING.match(text, pos, eol):
+                yield from close(last_end)
+                yield (pos, eol, self.count(text, pos, eol), True)
+            else:
+                is_table = _TABLE.match(text, pos, eol) is not None
+                if start >= 0 and is_table != table:
+                    yield from close(last_end)
+                if start < 0:
+                    start, table = pos, is_table
+            last_end, pos = eol, eol + 1
+        yield from close(last_end)
+
+    def _split(self, text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Cut an oversized block on line boundaries, falling back to words."""
+        lo = start
+        tokens = 0
+        pos = start
+        while pos < end:
+            eol = text.find("\n", pos, end)
+            eol = end if eol < 0 else eol
+            size = self.count(text, pos, eol)
+            if size > self.max_tokens:
+                if tokens:
+                    yield lo, pos - 1
+                yield from self._split_words(text, pos, eol)
+                lo, tokens = eol + 1, 0
+            elif tokens + size > self.max_tokens:
+                yield lo, pos - 1
+                lo, tokens = pos, size
+            else:
+                tokens += size
+            pos = eol + 1
+        if tokens and lo < end:
+            yield lo, end
+
+    def _split_words(self, text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        lo = -1
+        hi = start
+        tokens = 0
+        for word in _WORD.finditer(text, start, end):
+            size = self.count(text, word.start(), word.end())
+            if lo >= 0 and tokens + size > self.max_tokens:
+                yield lo, hi
+                lo, tokens = -1, 0
+            if lo < 0:
+                lo = word.start()
+            hi = word.end()
+            tokens += size
+        if lo >= 0:
+            yield lo, hi
+
+
+def make_chunker(
+    kind: str,
+    *,
+    size: int,
+    overlap: int,
+    max_tokens: int,
+    overlap_tokens: int,
+    tokenizer: str = "",
+) -> Chunker:
+    """`kind` is "markdown" (structure-aware, token budgets) or "chars"."""
+    if kind == "chars":
+        return char_chunker(size, overlap)
+    if kind != "markdown":
+        raise ValueError(f"unknown chunker {kind!r} (expected 'markdown' or 'chars')")
+    count = hf_token_counter(tokenizer) if tokenizer else count_tokens
+    return MarkdownChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens, count=count)
+
+
+def chunker_signature(
+    kind: str, *, size: int, overlap: int, max_tokens: int, overlap_tokens: int, tokenizer: str = ""
+) -> str:
+    """Stable description of the chunking settings (a change re-chunks every file)."""
+    if kind == "chars":
+        return f"chars:{size}:{overlap}"
+    return f"markdown:{max_tokens}:{overlap_tokens}:{tokenizer or 'words'}"
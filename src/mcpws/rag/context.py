@@ -0,0 +1,196 @@
+# File: src/mcpws/rag/context.py
+"""
+Context assembly
+----------------
+Turns the retrieved passages for a query into the prompt context:
+
+  1. merge: passages from the same source that are adjacent (consecutive
+     `chunk` indexes) or whose text overlaps are joined into one passage, with
+     the overlapping text kept once
+  2. dedupe: a passage whose word-shingle Jaccard similarity with an already
+     kept passage is at least `dedup_threshold` is dropped (re-ingested copies
+     of the same document under another name, repeated boilerplate)
+  3. pack: passages are added in retrieval order while they fit in
+     `max_tokens`; one that does not fit is skipped in favour of smaller ones
+     further down, and if even the best passage is too large it is truncated
+
+Each passage is labelled with its source so the model can cite it.
+`ContextStats` reports tokens before/after (every passage labelled and
+concatenated vs assembled) so callers can log what was saved.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, FrozenSet, List, Sequence
+
+from .chunking import TokenCounter, count_tokens
+
+_WORDS = re.compile(r"\w+")
+
+
+@dataclass
+class Passage:
+    text: str
+    meta: Dict[str, Any] = field(default_factory=dict)
+    rank: int = 0
+
+    @property
+    def source(self) -> str:
+        return str(self.meta.get("source", ""))
+
+
+@dataclass
+class ContextStats:
+    passages_in: int = 0
+    passages_out: int = 0
+    merged: int = 0
+    duplicates: int = 0
+    over_budget: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+    tokens_saved: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class AssembledContext:
+    text: str
+    passages: List[Passage]
+    stats: ContextStats
+
+
+def _overlap(a: str, b: str, probe: int = 64) -> int:
+    """Length of the longest suffix of `a` that is a prefix of `b`."""
+    head = b[:probe]
+    if not head:
+        return 0
+    i = a.find(head)
+    while i >= 0:
+        if b.startswith(a[i:]):
+            return len(a) - i
+        i = a.find(head, i + 1)
+    return 0
+
+
+def _shingles(text: str, n: int = 3) -> FrozenSet[int]:
+    words = _WORDS.findall(text.lower())
+    if len(words) < n:
+        return frozenset({hash(" ".join(words))})
+    return frozenset(hash(" ".join(words[i : i + n])) for i in range(len(words) - n + 1))
+
+
+def _jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def merge_adjacent(passages: Sequence[Passage]) -> List[Passage]:
+    """Join same-source passages that are consecutive chunks or overlap."""
+    by_source: Dict[str, List[Passage]] = {}
+    for p in passages:
+        by_source.setdefault(p.source, []).append(p)
+
+    merged: List[Passage] = []
+    for group in by_source.values():
+        group.sort(key=lambda p: (_chunk_index(p), p.rank))
+        run = group[0]
+        for p in group[1:]:
+            cut = _overlap(run.text, p.text)
+            consecutive = _chunk_index(p) - _chunk_index(run, last=True) == 1
+            if cut or consecutive:
+                meta = dict(run.meta)
+                meta["chunk_last"] = _chunk_index(p)
+                run = Passage(
+                    text=run.text + p.text[cut:] if cut else f"{run.text}\n\n{p.text}",
+                    meta=meta,
+                    rank=min(run.rank, p.rank),
+                )
+            else:
+                merged.append(run)
+                run = p
+        merged.append(run)
+    merged.sort(key=lambda p: p.rank)
+    return merged
+
+
+def _chunk_index(p: Passage, last: bool = False) -> int:
+    value = p.meta.get("chunk_last" if last and "chunk_last" in p.meta else "chunk")
+    return value if isinstance(value, int) else -2
+
+
+def _label(p: Passage) -> str:
+    return f"[{p.source}]\n{p.text}" if p.source else p.text
+
+
+def _truncate(text: str, max_tokens: int, count: TokenCounter) -> str:
+    end = 0
+    used = 0
+    for word in re.finditer(r"\S+", text):
+        used += count(text, word.start(), word.end())
+        if used > max_tokens:
+            break
+        end = word.end()
+    return text[:end]
+
+
+def assemble_context(
+    passages: Sequence[Passage],
+    *,
+    max_tokens: int = 0,
+    dedup_threshold: float = 0.85,
+    count: TokenCounter = count_tokens,
+    separator: str = "\n\n",
+) -> AssembledContext:
+    """Merge, deduplicate and pack `passages` (in rank order) into a context string."""
+    stats = ContextStats(passages_in=len(passages))
+    # Labels are counted on both sides so `tokens_saved` only reflects assembly.
+    naive = separator.join(_label(p) for p in passages)
+    stats.tokens_in = count(naive, 0, len(naive))
+
+    merged = merge_adjacent(passages)
+    stats.merged = len(passages) - len(merged)
+
+    kept: List[Passage] = []
+    seen: List[FrozenSet[int]] = []
+    for p in merged:
+        sh = _shingles(p.text)
+        if dedup_threshold > 0 and any(_jaccard(sh, s) >= dedup_threshold for s in seen):
+            stats.duplicates += 1
+            continue
+        seen.append(sh)
+        kept.append(p)
+
+    packed: List[Passage] = []
+    used = 0
+    sep_tokens = count(separator, 0, len(separator))
+    for p in kept:
+        label = _label(p)
+        size = count(label, 0, len(label)) + (sep_tokens if packed else 0)
+        if max_tokens and used + size > max_tokens:
+            if packed:
+                stats.over_budget += 1
+                continue
+            text = _truncate(
+                p.text, max(0, max_tokens - (size - count(p.text, 0, len(p.text)))), count
+            )
+            p = Passage(text=text, meta=p.meta, rank=p.rank)
+            label = _label(p)
+            size = count(label, 0, len(label))
+        packed.append(p)
+        used += size
+
+    text = separator.join(_label(p) for p in packed)
+    stats.passages_out = len(packed)
+    stats.tokens_out = count(text, 0, len(text))
+    stats.tokens_saved = stats.tokens_in - stats.tokens_out
+    return AssembledContext(text=text, passages=packed, stats=stats)
+
+
+def passages_from(docs: Sequence[str], metas: Sequence[Dict[str, Any]]) -> List[Passage]:
+    """Passages in retrieval order (rank = position)."""
+    return [Passage(text=d, meta=dict(m), rank=i) for i, (d, m) in enumerate(zip(docs, metas))]
@@ -0,0 +1,160 @@
+# File: src/mcpws/rag/convert.py
+"""
+Docling conversion worker
+-------------------------
+`convert_document` runs inside an executor (process pool by default, or a
+thread pool). Each process owns a `ConverterPool` of warm `DocumentConverter`
+instances: a caller checks one out, converts, and returns it, so model and
+pipeline initialization is paid once per instance instead of once per file.
+
+  - process mode: `init_pool(1)` is the executor initializer, i.e. one warm
+    converter per worker process
+  - thread mode: the server calls `init_pool(n)` once and its threads share it
+
+Input is a path (uploads are spooled to disk first, see `uploads.py`), so only
+the path crosses the process boundary; results are plain, picklable data
+(markdown text + PNG bytes) plus the time the call spent waiting: for a free
+worker (measured from the caller's submit time, since in process mode each
+worker converts one file at a time) and for a converter.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+log = logging.getLogger("docling_mcp")
+
+
+def _new_converter() -> Any:
+    from docling.datamodel.base_models import InputFormat
+    from docling.document_converter import DocumentConverter
+
+    converter = DocumentConverter()
+    # docling v2 builds the layout/table models on the first `convert()`;
+    # do it now so a warm converter really is warm (images share this pipeline).
+    converter.initialize_pipeline(InputFormat.PDF)
+    return converter
+
+
+class ConverterPool:
+    def __init__(self, size: int = 1, factory: Callable[[], Any] = _new_converter) -> None:
+        self.size = max(1, size)
+        self._factory = factory
+        self._idle: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.checkouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def warm(self) -> None:
+        """Build every instance up front so the first requests don't pay for it."""
+        while self._grow():
+            pass
+
+    @contextmanager
+    def checkout(self) -> Iterator[Tuple[Any, float]]:
+        """Yield `(converter, waited_ms)`; the converter goes back to the pool on exit."""
+        t0 = time.perf_counter()
+        if self._idle.empty():
+            self._grow()
+        converter = self._idle.get()
+        waited = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms_total += waited
+            self.wait_ms_max = max(self.wait_ms_max, waited)
+        try:
+            yield converter, waited
+        finally:
+            self._idle.put(converter)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self.wait_ms_total / self.checkouts if self.checkouts else 0.0
+            return {
+                "size": self.size,
+                "created": self.created,
+                "idle": self._idle.qsize(),
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(avg, 2),
+                "max_wait_ms": round(self.wait_ms_max, 2),
+            }
+
+    def _grow(self) -> bool:
+        with self._lock:
+            if self.created >= self.size:
+                return False
+            self.created += 1
+        try:
+            self._idle.put(self._factory())
+        except BaseException:
+            with self._lock:
+                self.created -= 1
+            raise
+        return True
+
+
+_pool: Optional[ConverterPool] = None
+
+
+def init_pool(size: int = 1, warm: bool = True) -> ConverterPool:
+    """Create this process's converter pool (also used as executor initializer)."""
+    global _pool
+    _pool = ConverterPool(size)
+    if warm:
+        try:
+            _pool.warm()
+        except Exception as e:  # pragma: no cover - docling missing/broken
+            log.warning(f"converter pool warm-up failed in pid {os.getpid()}: {e}")
+    return _pool
+
+
+def get_pool() -> ConverterPool:
+    return _pool if _pool is not None else init_pool(1, warm=False)
+
+
+def warm_worker() -> int:
+    """No-op task used to make a process pool start (and warm) its workers."""
+    get_pool()
+    return os.getpid()
+
+
+@dataclass
+class Converted:
+    filename: str
+    text: str
+    images: List[bytes] = field(default_factory=list)
+    pool_wait_ms: float = 0.0
+
+
+def convert_document(
+    filename: str, path: str, return_images: bool = False, submitted: Optional[float] = None
+) -> Converted:
+    """`submitted` is the caller's `time.time()` when it handed the call to the executor."""
+    queued = max(0.0, (time.time() - submitted) * 1000.0) if submitted is not None else 0.0
+    with get_pool().checkout() as (converter, waited):
+        # Use Any for the conversion result to keep mypy happy across docling versions
+        result: Any = converter.convert(path)
+
+    images: List[bytes] = []
+    if return_images and getattr(result, "images", None):
+        for img in result.images:
+            buf = io.BytesIO()
+            img.pil_image.save(buf, format="PNG")
+            images.append(buf.getvalue())
+
+    return Converted(
+        filename=filename,
+        text=result.document.export_to_markdown(),
+        images=images,
+        pool_wait_ms=queued + waited,
+    )
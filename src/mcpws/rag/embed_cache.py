@@ -0,0 +1,107 @@
+# File: src/mcpws/rag/embed_cache.py
+"""
+Embedding cache
+---------------
+Persistent cache of embeddings keyed by (model id, sha256(text)), backed by a
+single SQLite file (or `:memory:`). Vectors are stored as packed float32.
+
+Eviction is LRU by entry count: every hit refreshes `last_used`, and once the
+table grows past `max_entries` the least recently used rows are dropped.
+Safe to share between threads.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str = ":memory:", max_entries: int = 100_000) -> None:
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._tick = 0
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, hash TEXT NOT NULL, vec BLOB NOT NULL,"
+            " last_used INTEGER NOT NULL, PRIMARY KEY (model, hash))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings(last_used)")
+        row = self._db.execute("SELECT COALESCE(MAX(last_used), 0) FROM embeddings").fetchone()
+        self._tick = int(row[0])
+        self._db.commit()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        hashes = [text_hash(t) for t in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for i in range(0, len(hashes), 500):
+                part = hashes[i : i + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._db.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE model = ? AND hash IN ({marks})",
+                    [model, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = array("f", blob).tolist()
+            if found:
+                self._tick += 1
+                self._db.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(self._tick, model, h) for h in found],
+                )
+                self._db.commit()
+            out = [found.get(h) for h in hashes]
+            hit = sum(1 for v in out if v is not None)
+            self.hits += hit
+            self.misses += len(out) - hit
+        return out
+
+    def put_many(self, model: str, texts: Sequence[str], vecs: Sequence[Sequence[float]]) -> None:
+        if not texts:
+            return
+        with self._lock:
+            self._tick += 1
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vec, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                [
+                    (model, text_hash(t), array("f", v).tobytes(), self._tick)
+                    for t, v in zip(texts, vecs)
+                ],
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = int(count) - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE rowid IN"
+                " (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return {
+            "entries": int(count),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,105 @@
+# File: src/mcpws/rag/executors.py
+"""
+Metered executors
+-----------------
+Size-limited thread pools for the blocking work behind the async handlers,
+one per kind of work so a slow dependency can only exhaust its own pool:
+
+  - network:   watsonx embedding/generation calls (mostly waiting on I/O)
+  - inference: local sentence-transformers / cross-encoder models (CPU-bound,
+               so a small pool; torch releases the GIL while it computes)
+  - store:     Chroma and the SQLite side indexes
+
+`MeteredExecutor.run` awaits a call on the pool and records how long it
+waited for a free worker, so `/metrics` can show queue depth and queue time
+per pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar, cast
+
+T = TypeVar("T")
+
+
+class MeteredExecutor:
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"{self.name}-"
+                )
+            return self._pool
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        submitted = time.perf_counter()
+        state = {"started": False, "abandoned": False}
+        with self._lock:
+            self.queued += 1
+
+        def call() -> Optional[T]:
+            waited = (time.perf_counter() - submitted) * 1000.0
+            with self._lock:
+                if state["abandoned"]:
+                    return None
+                state["started"] = True
+                self.queued -= 1
+                self.running += 1
+                self.wait_ms_total += waited
+                self.wait_ms_max = max(self.wait_ms_max, waited)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.failed += 0 if ok else 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            return cast(T, await loop.run_in_executor(self._executor(), call))
+        except asyncio.CancelledError:
+            with self._lock:
+                if not state["started"]:
+                    # The caller gave up before a worker picked it up; don't run it.
+                    state["abandoned"] = True
+                    self.queued -= 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            done = self.completed
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": done,
+                "failed": self.failed,
+                "avg_wait_ms": round(self.wait_ms_total / done, 2) if done else 0.0,
+                "max_wait_ms": round(self.wait_ms_max, 2),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
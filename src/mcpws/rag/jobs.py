@@ -0,0 +1,111 @@
+# File: src/mcpws/rag/jobs.py
+"""
+Background jobs
+---------------
+A small in-process job queue used by `docling.ingest` in background mode: the
+request returns a job id immediately and a fixed pool of asyncio workers
+processes the queue. Progress lives on the job's `IngestStats`, which the
+pipeline updates as files are converted and chunks embedded/upserted.
+
+Finished jobs are kept (up to `retain`) so clients can poll `/jobs/{id}`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .pipeline import IngestStats
+
+JobFn = Callable[["Job"], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class Job:
+    id: str
+    status: str = "queued"  # queued | running | done | failed
+    stats: IngestStats = field(default_factory=IngestStats)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": self.stats.as_dict(),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    def __init__(self, workers: int = 1, retain: int = 1000) -> None:
+        self.workers = max(1, workers)
+        self.retain = max(1, retain)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional["asyncio.Queue[tuple[Job, JobFn]]"] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+
+    def submit(self, fn: JobFn) -> Job:
+        """Queue `fn(job)`; must be called from the server's event loop."""
+        self._ensure_workers()
+        assert self._queue is not None
+        job = Job(id=uuid.uuid4().hex)
+        self._jobs[job.id] = job
+        self._evict()
+        self._queue.put_nowait((job, fn))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job, fn = await queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await fn(job)
+                job.status = "done"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+                queue.task_done()
+
+    def _evict(self) -> None:
+        # Drop the oldest finished jobs once over the retention limit.
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.retain:
+                break
+            if self._jobs[job_id].status in ("done", "failed"):
+                del self._jobs[job_id]
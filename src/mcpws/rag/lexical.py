@@ -0,0 +1,181 @@
+# File: src/mcpws/rag/lexical.py
+"""
+Lexical index
+-------------
+BM25 inverted index over the ingested chunks, kept next to the Chroma data in
+a single SQLite file (or `:memory:`) and updated incrementally by the same
+upsert/delete calls that write the vector store, so it never needs a rebuild
+on startup.
+
+Dense retrieval is weak on exact identifiers ("clause 4.2.1", "SOW-2291"), so
+terms keep dotted/dashed compounds whole *and* index their parts. `rrf` fuses
+the lexical and vector rankings with reciprocal-rank fusion.
+
+    docs(id, namespace, source, length) one row per chunk
+    postings(term, id, tf)              term frequencies per chunk
+
+Document count and total length are kept in memory for the BM25 length
+normalization (over the whole index, all namespaces). Searches are limited
+to one namespace (tenant). Safe to share between threads.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+_TERM = re.compile(r"\w+(?:[.\-/]\w+)*")
+_PART = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to was were "
+    "what when where which who will with".split()
+)
+
+
+def terms(text: str) -> List[str]:
+    out: List[str] = []
+    for m in _TERM.finditer(text.lower()):
+        term = m.group()
+        if term in _STOPWORDS:
+            continue
+        out.append(term)
+        if not term.isalnum():
+            out.extend(p for p in _PART.findall(term) if p not in _STOPWORDS)
+    return out
+
+
+def rrf(rankings: Iterable[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Reciprocal-rank fusion: sum of 1 / (k + rank) over every ranking an id is in."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+
+
+class LexicalIndex:
+    def __init__(self, path: str = ":memory:", k1: float = 1.2, b: float = 0.75) -> None:
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " id TEXT PRIMARY KEY, source TEXT NOT NULL, length INTEGER NOT NULL,"
+            " namespace TEXT NOT NULL DEFAULT '');"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL, id TEXT NOT NULL, tf INTEGER NOT NULL,"
+            " PRIMARY KEY (term, id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_id ON postings(id);"
+        )
+        columns = {r[1] for r in self._db.execute("PRAGMA table_info(docs)")}
+        if "namespace" not in columns:
+            self._db.execute("ALTER TABLE docs ADD COLUMN namespace TEXT NOT NULL DEFAULT ''")
+        self._db.execute("CREATE INDEX IF NOT EXISTS docs_source ON docs(namespace, source)")
+        row = self._db.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone()
+        self._docs, self._total_len = int(row[0]), int(row[1])
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._docs
+
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metas: Optional[Sequence[Mapping[str, Any]]] = None,
+        namespace: str = "",
+    ) -> None:
+        """Index (or re-index) chunks by id."""
+        rows: List[Tuple[str, str, int, str]] = []
+        postings: List[Tuple[str, str, int]] = []
+        for i, (doc_id, text) in enumerate(zip(ids, texts)):
+            counts = Counter(terms(text))
+            source = str(metas[i].get("source", "")) if metas else ""
+            rows.append((doc_id, source, sum(counts.values()), namespace))
+            postings.extend((term, doc_id, tf) for term, tf in counts.items())
+        with self._lock:
+            self._remove([r[0] for r in rows])
+            self._db.executemany(
+                "INSERT INTO docs (id, source, length, namespace) VALUES (?, ?, ?, ?)", rows
+            )
+            self._db.executemany("INSERT INTO postings (term, id, tf) VALUES (?, ?, ?)", postings)
+            self._docs += len(rows)
+            self._total_len += sum(r[2] for r in rows)
+            self._db.commit()
+
+    def delete(self, ids: Sequence[str], namespace: str = "") -> None:
+        """Remove chunks by id; ids indexed under another namespace are left alone."""
+        ids = list(ids)
+        with self._lock:
+            owned: List[str] = []
+            for i in range(0, len(ids), 500):
+                part = ids[i : i + 500]
+                marks = ",".join("?" * len(part))
+                owned.extend(
+                    r[0]
+                    for r in self._db.execute(
+                        f"SELECT id FROM docs WHERE namespace = ? AND id IN ({marks})",
+                        (namespace, *part),
+                    )
+                )
+            self._remove(owned)
+            self._db.commit()
+
+    def delete_source(self, source: str, namespace: str = "") -> None:
+        with self._lock:
+            ids = [
+                r[0]
+                for r in self._db.execute(
+                    "SELECT id FROM docs WHERE namespace = ? AND source = ?", (namespace, source)
+                )
+            ]
+            self._remove(ids)
+            self._db.commit()
+
+    def search(self, query: str, k: int = 10, namespace: str = "") -> List[Tuple[str, float]]:
+        """Top-k `(chunk id, BM25 score)` for `query` within `namespace`."""
+        scores: Dict[str, float] = {}
+        with self._lock:
+            n = self._docs
+            if not n:
+                return []
+            avg_len = self._total_len / n or 1.0
+            for term in set(terms(query)):
+                rows = self._db.execute(
+                    "SELECT p.id, p.tf, d.length FROM postings p JOIN docs d ON d.id = p.id"
+                    " WHERE p.term = ? AND d.namespace = ?",
+                    (term, namespace),
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1.0 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+                for doc_id, tf, length in rows:
+                    norm = tf + self.k1 * (1.0 - self.b + self.b * length / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / norm
+        return heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "docs": self._docs,
+                "avg_len": round(self._total_len / self._docs, 1) if self._docs else 0.0,
+            }
+
+    def _remove(self, ids: List[str]) -> None:
+        for i in range(0, len(ids), 500):
+            part = ids[i : i + 500]
+            marks = ",".join("?" * len(part))
+            row = self._db.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs WHERE id IN ({marks})", part
+            ).fetchone()
+            self._docs -= int(row[0])
+            self._total_len -= int(row[1])
+            self._db.execute(f"DELETE FROM docs WHERE id IN ({marks})", part)
+            self._db.execute(f"DELETE FROM postings WHERE id IN ({marks})", part)
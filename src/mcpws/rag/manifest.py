@@ -0,0 +1,122 @@
+# File: src/mcpws/rag/manifest.py
+"""
+Document manifest
+-----------------
+Records what has been ingested per source file so re-ingestion can be
+incremental:
+
+  - `sources`: source -> fingerprint of the file bytes + caller metadata
+  - `chunks`:  (source, chunk id) -> fingerprint of the chunk text, metadata
+               and position in the file
+
+Chunk ids are content-addressed (`<source>:<sha256(text)[:16]>`), so an edit
+only produces new ids for the chunks that actually changed; ids that disappear
+from a new version are orphans to delete.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+
+def _sha(*parts: bytes) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p)
+    return h.hexdigest()
+
+
+def meta_fingerprint(meta: Mapping[str, Any]) -> str:
+    return _sha(json.dumps(meta, sort_keys=True, default=str).encode("utf-8"))
+
+
+def file_fingerprint(content_hash: str, meta: Mapping[str, Any], options: str = "") -> str:
+    """`options` describes processing settings (e.g. the chunker) that affect the output."""
+    parts = [content_hash.encode("ascii"), meta_fingerprint(meta).encode("ascii")]
+    if options:
+        parts.append(options.encode("utf-8"))
+    return _sha(*parts)
+
+
+def source_key(filename: str, namespace: str = "") -> str:
+    """Manifest/chunk-id key of a file: namespaced (e.g. per tenant) when `namespace` is set.
+
+    File names must not contain `/`: `acme/a.md` in the default namespace would
+    share the key (and chunk ids) of tenant `acme`'s `a.md`.
+    """
+    if "/" in filename:
+        raise ValueError(f"Invalid file name {filename!r} ('/' is not allowed)")
+    return f"{namespace}/{filename}" if namespace else filename
+
+
+def chunk_id(source: str, text: str) -> str:
+    return f"{source}:{_sha(text.encode('utf-8'))[:16]}"
+
+
+def chunk_fingerprint(text: str, meta: Mapping[str, Any], index: int) -> str:
+    """The chunk index is stored in the chunk metadata, so a chunk that moved
+    (an edit inserted/removed chunks before it) is upserted again."""
+    return _sha(
+        meta_fingerprint(meta).encode("ascii"), str(index).encode("ascii"), text.encode("utf-8")
+    )
+
+
+class DocumentManifest:
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            " source TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " source TEXT NOT NULL, chunk_id TEXT NOT NULL, fingerprint TEXT NOT NULL,"
+            " PRIMARY KEY (source, chunk_id));"
+        )
+        self._db.commit()
+
+    def file_fingerprint(self, source: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fingerprint FROM sources WHERE source = ?", (source,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def chunks(self, source: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT chunk_id, fingerprint FROM chunks WHERE source = ?", (source,)
+            ).fetchall()
+        return dict(rows)
+
+    def commit(self, source: str, fingerprint: str, chunks: Mapping[str, str]) -> None:
+        """Replace the record for `source` once all of its chunks are stored."""
+        with self._lock:
+            self._db.execute("DELETE FROM chunks WHERE source = ?", (source,))
+            self._db.executemany(
+                "INSERT INTO chunks (source, chunk_id, fingerprint) VALUES (?, ?, ?)",
+                [(source, cid, fp) for cid, fp in chunks.items()],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO sources (source, fingerprint, updated_at)"
+                " VALUES (?, ?, ?)",
+                (source, fingerprint, time.time()),
+            )
+            self._db.commit()
+
+    def record_chunks(self, source: str, chunks: Mapping[str, str]) -> None:
+        """Record what is stored for `source` after a failed ingest, leaving its
+        file fingerprint alone so the next ingest processes the file again (and
+        can delete chunks that turn out to be orphans)."""
+        with self._lock:
+            self._db.execute("DELETE FROM chunks WHERE source = ?", (source,))
+            self._db.executemany(
+                "INSERT INTO chunks (source, chunk_id, fingerprint) VALUES (?, ?, ?)",
+                [(source, cid, fp) for cid, fp in chunks.items()],
+            )
+            self._db.commit()
@@ -0,0 +1,153 @@
+# File: src/mcpws/rag/parse_cache.py
+"""
+Parse cache
+-----------
+Content-addressed, on-disk cache of Docling conversion output, shared by
+`docling.parse` and `docling.ingest`. Entries are keyed by the SHA-256 of the
+uploaded bytes, whether images were extracted, and an options string
+(converter version), and laid out as:
+
+    <dir>/<key[:2]>/<key>/
+        meta.json     filename, has_images, size
+        text.md       markdown export
+        000.png ...   extracted images (only when they were requested)
+
+The total size is capped at `max_bytes`: the least recently used entries (by
+directory mtime, refreshed on every hit) go first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .convert import Converted
+
+
+class ParseCache:
+    def __init__(self, directory: str, max_bytes: int, options: str = "") -> None:
+        self.directory = directory
+        self.max_bytes = max(0, max_bytes)
+        self.options = options
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._sizes: Dict[str, int] = {}
+        for key, path in self._entries():
+            self._sizes[key] = _dir_size(path)
+
+    def key(self, sha256: str, images: bool = False) -> str:
+        raw = f"{sha256}:{int(images)}:{self.options}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, sha256: str, *, images: bool = False) -> Optional[Converted]:
+        key = self.key(sha256, images)
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with open(os.path.join(path, "text.md"), encoding="utf-8") as fh:
+                text = fh.read()
+            blobs: List[bytes] = []
+            for i in range(int(meta.get("images", 0)) if images else 0):
+                with open(os.path.join(path, f"{i:03d}.png"), "rb") as fh:
+                    blobs.append(fh.read())
+            now = time.time()
+            os.utime(path, (now, now))
+        except (OSError, ValueError):
+            # Missing, or evicted by another request while we were reading it.
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return Converted(filename=meta.get("filename", ""), text=text, images=blobs)
+
+    def put(self, sha256: str, converted: Converted, *, images: bool = False) -> None:
+        key = self.key(sha256, images)
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+        try:
+            with open(os.path.join(staging, "text.md"), "w", encoding="utf-8") as fh:
+                fh.write(converted.text)
+            if images:
+                for i, blob in enumerate(converted.images):
+                    with open(os.path.join(staging, f"{i:03d}.png"), "wb") as fh:
+                        fh.write(blob)
+            meta = {
+                "filename": converted.filename,
+                "has_images": images,
+                "images": len(converted.images) if images else 0,
+            }
+            with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as fh:
+                json.dump(meta, fh)
+            size = _dir_size(staging)
+            with self._lock:
+                shutil.rmtree(target, ignore_errors=True)
+                os.replace(staging, target)
+                self._sizes[key] = size
+                self._evict(keep=key)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._sizes),
+                "bytes": sum(self._sizes.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self, keep: str) -> None:
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+        by_age: List[Tuple[float, str]] = []
+        for key in self._sizes:
+            try:
+                by_age.append((os.stat(self._path(key)).st_mtime, key))
+            except FileNotFoundError:
+                by_age.append((0.0, key))
+        for _, key in sorted(by_age):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _entries(self) -> List[Tuple[str, str]]:
+        out: List[Tuple[str, str]] = []
+        for shard in os.listdir(self.directory):
+            shard_dir = os.path.join(self.directory, shard)
+            if len(shard) != 2 or not os.path.isdir(shard_dir):
+                continue
+            for key in os.listdir(shard_dir):
+                out.append((key, os.path.join(shard_dir, key)))
+        return out
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except FileNotFoundError:
+            pass
+    return total
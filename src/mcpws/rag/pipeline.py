@@ -0,0 +1,394 @@
+# File: src/mcpws/rag/pipeline.py
+"""
+Ingestion pipeline
+------------------
+Staged ingestion for `docling.ingest`:
+
+    read (spool to disk) -> convert -> chunk -> [bounded queue] -> embed -> upsert
+
+With a `DocumentManifest` the pipeline is incremental: unchanged files are
+skipped before conversion, only new/changed chunks are embedded and upserted,
+and chunk ids that vanished from a file are deleted in one batched call.
+`options` (e.g. the chunker settings) is part of every file fingerprint, so
+changing it re-chunks files on their next ingest.
+
+Chunks from all files are streamed through a bounded queue into fixed-size
+embedding batches (capped by count and characters) and smaller upsert batches,
+so peak memory does not grow with the upload. Embed/upsert calls are retried
+with backoff; a batch that still fails only fails the files it belongs to
+(their file fingerprints are not committed, so the next ingest retries them,
+but the chunks they did store are recorded so they can be cleaned up as
+orphans), and everything else keeps its progress.
+
+Sources carry a `namespace` (e.g. a tenant): chunk ids and manifest entries
+are keyed by `<namespace>/<filename>`, embedding batches never mix
+namespaces, and the write callbacks receive the namespace so they can route to
+the right store.
+
+Every stage has its own concurrency limit, shared by all requests that use the
+same pipeline instance. Conversion is expected to run in a process pool and
+embedding/upserts in threads; chunking (`cpu`) and manifest reads/writes
+(`store`) are handed to the given runners, so the event loop stays free for
+queries while a large upload is being processed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict, dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from .manifest import (
+    DocumentManifest,
+    chunk_fingerprint,
+    chunk_id,
+    file_fingerprint,
+    source_key,
+)
+from .uploads import SpooledUpload
+
+ReadFn = Callable[[], Awaitable[SpooledUpload]]
+ConvertFn = Callable[[SpooledUpload], Awaitable[str]]
+ChunkFn = Callable[[str], Iterable[str]]
+EmbedFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+# Write callbacks take the source namespace as their last argument.
+UpsertFn = Callable[
+    [List[str], List[List[float]], List[str], List[Dict[str, Any]], str], Awaitable[None]
+]
+DeleteFn = Callable[[List[str], str], Awaitable[None]]
+PurgeFn = Callable[[str, str], Awaitable[None]]
+# Runs a blocking call off the event loop, e.g. `MeteredExecutor.run`.
+RunFn = Callable[..., Awaitable[Any]]
+
+T = TypeVar("T")
+
+
+@dataclass
+class IngestSource:
+    filename: str
+    read: ReadFn
+    meta: Dict[str, Any] = field(default_factory=dict)
+    namespace: str = ""
+
+    @property
+    def key(self) -> str:
+        return source_key(self.filename, self.namespace)
+
+
+@dataclass
+class IngestStats:
+    files_total: int = 0
+    files_converted: int = 0
+    files_ingested: int = 0  # fully stored (and committed to the manifest)
+    files_skipped: int = 0
+    files_failed: int = 0
+    chunks_total: int = 0
+    chunks_skipped: int = 0
+    chunks_embedded: int = 0
+    chunks_upserted: int = 0
+    chunks_deleted: int = 0
+    chunks_failed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class PipelineLimits:
+    read: int = 4
+    convert: int = 2
+    embed: int = 2
+    upsert: int = 1
+    embed_batch: int = 64
+    embed_batch_chars: int = 200_000
+    upsert_batch: int = 256
+    queue_size: int = 512
+    retries: int = 3
+    retry_backoff: float = 0.5
+
+
+@dataclass
+class _FileState:
+    source: IngestSource
+    fingerprint: str
+    fingerprints: Dict[str, str] = field(default_factory=dict)
+    stored: Dict[str, str] = field(default_factory=dict)  # upserted by this run
+    outstanding: int = 0
+    produced: bool = False
+    failed: bool = False
+    settled: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass
+class _Item:
+    state: _FileState
+    cid: str
+    idx: int
+    text: str
+
+    @property
+    def namespace(self) -> str:
+        return self.state.source.namespace
+
+
+class IngestPipeline:
+    def __init__(
+        self,
+        *,
+        convert: ConvertFn,
+        chunk: ChunkFn,
+        embed: EmbedFn,
+        upsert: UpsertFn,
+        delete: Optional[DeleteFn] = None,
+        purge: Optional[PurgeFn] = None,
+        manifest: Optional[DocumentManifest] = None,
+        limits: Optional[PipelineLimits] = None,
+        options: str = "",
+        cpu: Optional[RunFn] = None,
+        store: Optional[RunFn] = None,
+    ) -> None:
+        self.limits = limits or PipelineLimits()
+        self._cpu = cpu or _inline
+        self._store = store or _inline
+        self.options = options
+        self.manifest = manifest
+        self._convert = convert
+        self._chunk = chunk
+        self._embed = embed
+        self._upsert = upsert
+        self._delete = delete
+        self._purge = purge
+        self._read_sem = asyncio.Semaphore(max(1, self.limits.read))
+        self._convert_sem = asyncio.Semaphore(max(1, self.limits.convert))
+        self._embed_sem = asyncio.Semaphore(max(1, self.limits.embed))
+        self._upsert_sem = asyncio.Semaphore(max(1, self.limits.upsert))
+
+    async def run(
+        self, sources: Sequence[IngestSource], stats: Optional[IngestStats] = None
+    ) -> IngestStats:
+        """Ingest `sources`; per-file and per-batch failures are recorded in `stats`."""
+        stats = stats or IngestStats()
+        stats.files_total += len(sources)
+        queue: "asyncio.Queue[Optional[_Item]]" = asyncio.Queue(
+            maxsize=max(1, self.limits.queue_size)
+        )
+        consumer = asyncio.create_task(self._consume(queue, stats))
+        producers = [asyncio.create_task(self._produce(src, queue, stats)) for src in sources]
+        try:
+            await asyncio.gather(*producers)
+            await queue.put(None)
+            await consumer
+        except BaseException:
+            for t in (*producers, consumer):
+                t.cancel()
+            await asyncio.gather(*producers, consumer, return_exceptions=True)
+            raise
+        return stats
+
+    # ---- read -> convert -> chunk ----
+    async def _produce(
+        self, src: IngestSource, queue: "asyncio.Queue[Optional[_Item]]", stats: IngestStats
+    ) -> None:
+        state: Optional[_FileState] = None
+        previous: Dict[str, str] = {}
+        try:
+            async with self._read_sem:
+                spooled = await src.read()
+            try:
+                fingerprint = file_fingerprint(spooled.sha256, src.meta, self.options)
+                known = (
+                    await self._store(self.manifest.file_fingerprint, src.key)
+                    if self.manifest
+                    else None
+                )
+                if known == fingerprint:
+                    stats.files_skipped += 1
+                    return
+
+                async with self._convert_sem:
+                    text = await self._convert(spooled)
+            finally:
+                spooled.remove()
+            stats.files_converted += 1
+
+            previous = await self._store(self.manifest.chunks, src.key) if self.manifest else {}
+            if known is None and self._purge is not None:
+                # Never committed: clear anything stored under an older id scheme
+                # (or left by a failed first ingest) and start from scratch.
+                await self._purge(src.filename, src.namespace)
+                previous = {}
+
+            state = _FileState(source=src, fingerprint=fingerprint)
+            pieces = await self._cpu(self._chunk_file, text, src)
+            del text
+            for idx, piece, cid, fp in pieces:
+                state.fingerprints[cid] = fp
+                stats.chunks_total += 1
+                if previous.get(cid) == fp:
+                    stats.chunks_skipped += 1
+                    continue
+                state.outstanding += 1
+                await queue.put(_Item(state, cid, idx, piece))
+            del pieces
+
+            state.produced = True
+            if state.outstanding:
+                await state.settled.wait()
+            if state.failed:
+                stats.files_failed += 1
+                await self._record_partial(state, previous)
+                return
+
+            orphans = [cid for cid in previous if cid not in state.fingerprints]
+            if orphans and self._delete is not None:
+                async with self._upsert_sem:
+                    await self._retry(self._delete, orphans, src.namespace)
+                stats.chunks_deleted += len(orphans)
+            if self.manifest is not None:
+                await self._store(self.manifest.commit, src.key, fingerprint, state.fingerprints)
+            stats.files_ingested += 1
+        except Exception as e:
+            stats.files_failed += 1
+            stats.errors.append(f"{src.filename}: {e}")
+            if state is not None:
+                try:
+                    await self._record_partial(state, previous)
+                except Exception as record_error:
+                    stats.errors.append(f"{src.filename}: {record_error}")
+
+    async def _record_partial(self, state: _FileState, previous: Dict[str, str]) -> None:
+        """Keep track of chunks upserted before the file failed.
+
+        Without this the next ingest diffs against the old manifest and never
+        sees them, leaving them in the store for good.
+        """
+        if self.manifest is None or not state.stored:
+            return
+        await self._store(
+            self.manifest.record_chunks, state.source.key, {**previous, **state.stored}
+        )
+
+    def _chunk_file(self, text: str, src: IngestSource) -> List[Tuple[int, str, str, str]]:
+        """`(index, text, chunk id, fingerprint)` per chunk (blocking: runs on `cpu`)."""
+        out: List[Tuple[int, str, str, str]] = []
+        seen: Set[str] = set()
+        for idx, piece in enumerate(self._chunk(text)):
+            # Content-addressed ids; a repeated chunk within one file is stored once.
+            cid = chunk_id(src.key, piece)
+            if cid in seen:
+                continue
+            seen.add(cid)
+            out.append((idx, piece, cid, chunk_fingerprint(piece, src.meta, idx)))
+        return out
+
+    # ---- batch -> embed -> upsert ----
+    async def _consume(self, queue: "asyncio.Queue[Optional[_Item]]", stats: IngestStats) -> None:
+        tasks: Set["asyncio.Task[None]"] = set()
+        batch: List[_Item] = []
+        chars = 0
+        max_batch = max(1, self.limits.embed_batch)
+
+        async def dispatch() -> None:
+            nonlocal batch, chars
+            # Acquire before spawning so a busy embedder throttles the queue.
+            await self._embed_sem.acquire()
+            task = asyncio.create_task(self._process(batch, stats))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            batch, chars = [], 0
+
+        try:
+            while True:
+                # Nothing else is ready: don't hold a partial batch back.
+                if batch and queue.empty():
+                    await dispatch()
+                item = await queue.get()
+                if item is None:
+                    break
+                too_big = chars + len(item.text) > self.limits.embed_batch_chars
+                other_ns = bool(batch) and item.namespace != batch[0].namespace
+                if batch and (len(batch) >= max_batch or too_big or other_ns):
+                    await dispatch()
+                batch.append(item)
+                chars += len(item.text)
+            if batch:
+                await dispatch()
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            raise
+
+    async def _process(self, batch: List[_Item], stats: IngestStats) -> None:
+        try:
+            vecs = await self._retry(self._embed, [i.text for i in batch])
+            stats.chunks_embedded += len(batch)
+        except Exception as e:
+            self._settle(batch, stats, e)
+            return
+        finally:
+            self._embed_sem.release()
+
+        step = max(1, self.limits.upsert_batch)
+        for start in range(0, len(batch), step):
+            part = batch[start : start + step]
+            metas = [
+                {"source": i.state.source.filename, "chunk": i.idx, **i.state.source.meta}
+                for i in part
+            ]
+            try:
+                async with self._upsert_sem:
+                    await self._retry(
+                        self._upsert,
+                        [i.text for i in part],
+                        vecs[start : start + step],
+                        [i.cid for i in part],
+                        metas,
+                        part[0].namespace,
+                    )
+                stats.chunks_upserted += len(part)
+                self._settle(part, stats)
+            except Exception as e:
+                self._settle(part, stats, e)
+
+    def _settle(
+        self, items: List[_Item], stats: IngestStats, error: Optional[Exception] = None
+    ) -> None:
+        if error is not None:
+            stats.chunks_failed += len(items)
+            names = sorted({i.state.source.filename for i in items})
+            stats.errors.extend(f"{name}: {error}" for name in names)
+        for i in items:
+            if error is not None:
+                i.state.failed = True
+            else:
+                i.state.stored[i.cid] = i.state.fingerprints[i.cid]
+            i.state.outstanding -= 1
+            if i.state.produced and not i.state.outstanding:
+                i.state.settled.set()
+
+    async def _retry(self, fn: Callable[..., Awaitable[T]], *args: Any) -> T:
+        attempts = max(1, self.limits.retries)
+        for attempt in range(attempts - 1):
+            try:
+                return await fn(*args)
+            except Exception:
+                await asyncio.sleep(self.limits.retry_backoff * (2**attempt))
+        return await fn(*args)
+
+
+async def _inline(fn: Callable[..., T], *args: Any) -> T:
+    return fn(*args)
@@ -0,0 +1,210 @@
+# File: src/mcpws/rag/uploads.py
+"""
+Upload spooling
+---------------
+Parses a `multipart/form-data` request body as it arrives and writes each file
+part straight to its own temporary file, enforcing the size limit while
+streaming (an oversized file is rejected once the bytes received for it pass
+`max_bytes`, without ever being held in memory) and hashing the bytes on the
+way through.
+
+The endpoints read `request.stream()` themselves instead of declaring
+`UploadFile` parameters: Starlette would otherwise receive the whole body into
+its own temporary files before the handler runs, so the limit could only be
+checked after the fact and every accepted file was written to disk twice.
+
+Conversion then reads from the spooled path; callers remove it when done.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, BinaryIO, Dict, List, Optional, Tuple
+
+
+@dataclass
+class SpooledUpload:
+    filename: str
+    path: str
+    size: int
+    sha256: str
+
+    def remove(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class SpooledForm:
+    """Text fields and spooled file parts of a form, by field name."""
+
+    fields: Dict[str, str] = field(default_factory=dict)
+    files: Dict[str, List[SpooledUpload]] = field(default_factory=dict)
+
+    def remove(self) -> None:
+        for uploads in self.files.values():
+            for upload in uploads:
+                upload.remove()
+
+
+def upload_name(filename: Optional[str]) -> str:
+    """Client-supplied file name reduced to its last path component."""
+    name = (filename or "").replace("\\", "/").rsplit("/", 1)[-1].strip()
+    return name or "upload"
+
+
+def _multipart() -> Any:
+    try:
+        import python_multipart
+    except ImportError:  # python-multipart < 0.0.13
+        import multipart as python_multipart  # type: ignore[no-redef]
+    return python_multipart
+
+
+class _FormSpooler:
+    """`python-multipart` callbacks; file writes are queued and done by `flush`."""
+
+    def __init__(
+        self, form: SpooledForm, max_bytes: int, max_field_bytes: int, directory: Optional[str]
+    ) -> None:
+        self.form = form
+        self.max_bytes = max_bytes
+        self.max_field_bytes = max_field_bytes
+        self.directory = directory
+        self.pending: List[Tuple[BinaryIO, bytes]] = []
+        self.ended = False
+        self._open: List[BinaryIO] = []
+        self._done: List[BinaryIO] = []
+        self._header = b""
+        self._value = b""
+        self._disposition = b""
+        self._name = ""
+        self._data = bytearray()
+        self._file: Optional[Tuple[SpooledUpload, BinaryIO, Any]] = None
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+        self._data = bytearray()
+        self._file = None
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header.lower() == b"content-disposition":
+            self._disposition = self._value
+        self._header = self._value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = _multipart().multipart.parse_options_header(self._disposition)
+        self._name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options:
+            return
+        filename = upload_name(options[b"filename"].decode("utf-8", "replace"))
+        suffix = os.path.splitext(filename)[1]
+        fd, path = tempfile.mkstemp(prefix="docling-", suffix=suffix, dir=self.directory)
+        upload = SpooledUpload(filename=filename, path=path, size=0, sha256="")
+        self.form.files.setdefault(self._name, []).append(upload)
+        fh = os.fdopen(fd, "wb")
+        self._open.append(fh)
+        self._file = (upload, fh, hashlib.sha256())
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        chunk = data[start:end]
+        if self._file is None:
+            if len(self._data) + len(chunk) > self.max_field_bytes:
+                raise ValueError(f"Form field {self._name!r} is too large")
+            self._data.extend(chunk)
+            return
+        upload, fh, digest = self._file
+        upload.size += len(chunk)
+        if upload.size > self.max_bytes:
+            raise ValueError(
+                f"{upload.filename} exceeds {self.max_bytes // (1024 * 1024)} MB limit"
+            )
+        digest.update(chunk)
+        self.pending.append((fh, chunk))
+
+    def on_part_end(self) -> None:
+        if self._file is None:
+            self.form.fields[self._name] = self._data.decode("utf-8", "replace")
+            return
+        upload, fh, digest = self._file
+        upload.sha256 = digest.hexdigest()
+        self._done.append(fh)
+
+    def on_end(self) -> None:
+        self.ended = True
+
+    def flush(self) -> None:
+        for fh, chunk in self.pending:
+            fh.write(chunk)
+        self.pending.clear()
+        for fh in self._done:
+            fh.close()
+            self._open.remove(fh)
+        self._done.clear()
+
+    def discard(self) -> None:
+        for fh in self._open:
+            fh.close()
+        self.form.remove()
+
+
+async def spool_form(
+    body: AsyncIterable[bytes],
+    content_type: str,
+    *,
+    max_bytes: int,
+    directory: Optional[str] = None,
+    max_field_bytes: int = 1024 * 1024,
+) -> SpooledForm:
+    """Spool a multipart body (e.g. `request.stream()`); `max_bytes` is per file.
+
+    Nothing is left on disk if parsing fails; otherwise the caller removes the
+    files (`SpooledForm.remove`, or `SpooledUpload.remove` one by one).
+    """
+    multipart = _multipart()
+    kind, params = multipart.multipart.parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if kind != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected a multipart/form-data body")
+
+    form = SpooledForm()
+    spooler = _FormSpooler(form, max_bytes, max_field_bytes, directory)
+    callbacks = {
+        name: getattr(spooler, name)
+        for name in (
+            "on_part_begin",
+            "on_part_data",
+            "on_part_end",
+            "on_header_field",
+            "on_header_value",
+            "on_header_end",
+            "on_headers_finished",
+            "on_end",
+        )
+    }
+    parser = multipart.MultipartParser(boundary, callbacks)
+    try:
+        async for chunk in body:
+            parser.write(chunk)
+            if spooler.pending:
+                await asyncio.to_thread(spooler.flush)
+        parser.finalize()
+        await asyncio.to_thread(spooler.flush)
+        if not spooler.ended:
+            raise ValueError("Incomplete multipart body")
+    except BaseException:
+        spooler.discard()
+        raise
+    return form
@@ -1,7 +1,9 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel, Field
 import uvicorn
 
+from .catalog import catalog_response
+
 app = FastAPI(title="Calculator MCP Server")
 
 
@@ -11,20 +13,23 @@ class AddPayload(BaseModel):
 
 
 @app.get("/tools")
-def tools():
-    return {
-        "tools": [
-            {
-                "name": "calc.add",
-                "description": "Add two numbers",
-                "schema": {
-                    "type": "object",
-                    "properties": {"a": {"type": "number"}, "b": {"type": "number"}},
-                    "required": ["a", "b"],
-                },
-            }
-        ]
-    }
+def tools(request: Request):
+    return catalog_response(
+        request,
+        {
+            "tools": [
+                {
+                    "name": "calc.add",
+                    "description": "Add two numbers",
+                    "schema": {
+                        "type": "object",
+                        "properties": {"a": {"type": "number"}, "b": {"type": "number"}},
+                        "required": ["a", "b"],
+                    },
+                }
+            ]
+        },
+    )
 
 
 @app.post("/call/calc.add")
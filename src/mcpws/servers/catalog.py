@@ -0,0 +1,38 @@
+"""
+Tool catalog responses
+----------------------
+`/tools` answers with an ETag over the catalog, so gateway clients holding a
+cached copy (see `utils.tool_catalog.ToolCatalogCache`) can revalidate with
+If-None-Match and get a bodyless 304 when nothing changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+
+def catalog_etag(body: Any) -> str:
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return '"' + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 §13.1.2): ignore W/ prefixes.
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return etag in tags
+
+
+def catalog_response(request: Request, body: Any, max_age: int = 0) -> Response:
+    """JSON `body` with an ETag; 304 without a body if the client already has it."""
+    etag = catalog_etag(body)
+    headers = {"ETag": etag, "Cache-Control": f"max-age={max_age}" if max_age else "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(body, headers=headers)
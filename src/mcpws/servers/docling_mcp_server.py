@@ -1,19 +1,60 @@
 # File: src/mcpws/servers/docling_mcp_server.py
 from __future__ import annotations
 
+import asyncio
 import base64
-import io
+import importlib.metadata
+import importlib.util
 import json
+import multiprocessing
 import os
+import re
+import tempfile
+import threading
 import time
 import uuid
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union, cast
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 
-import chromadb
-from chromadb.utils import embedding_functions
-from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from ..rag.answer_cache import AnswerCache
+from ..rag.batcher import EmbeddingBatcher
+from ..rag.breaker import OPEN as BREAKER_OPEN
+from ..rag.breaker import CircuitBreaker, CircuitOpenError, RetryBudget
+from ..rag.chunking import Chunker, chunker_signature, make_chunker
+from ..rag.context import AssembledContext, assemble_context, passages_from
+from ..rag.convert import Converted, convert_document, get_pool, init_pool, warm_worker
+from ..rag.embed_cache import EmbeddingCache
+from ..rag.executors import MeteredExecutor
+from ..rag.jobs import Job, JobQueue
+from ..rag.lexical import LexicalIndex, rrf
+from ..rag.manifest import DocumentManifest, source_key
+from ..rag.parse_cache import ParseCache
+from ..rag.pipeline import IngestPipeline, IngestSource, IngestStats, PipelineLimits, ReadFn
+from ..rag.uploads import SpooledForm, SpooledUpload, spool_form
+from .catalog import catalog_response
+
 # ---------- Logging ----------
 import logging
 
@@ -28,76 +69,336 @@ def jlog(event: str, **fields: Any) -> None:
 
 # ---------- Settings ----------
 CHROMA_DIR = os.getenv("CHROMA_DIR", "").strip()
-COLLECTION_NAME = os.getenv("DOC_COLLECTION", "docling_rag")
+COLLECTION_NAME = os.getenv("DOC_COLLECTION", "docling_rag")  # tenants get <name>__<tenant>
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+# "markdown" = split on headings/paragraphs/tables with token budgets,
+# "chars" = fixed CHUNK_SIZE/CHUNK_OVERLAP character windows
+CHUNKER = os.getenv("CHUNKER", "markdown").strip().lower()
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "256"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+CHUNK_TOKENIZER = os.getenv("CHUNK_TOKENIZER", "").strip()  # HF tokenizer name (optional)
 MAX_FILE_MB = int(os.getenv("MAX_FILE_MB", "50"))
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "").strip() or None  # spool dir (default: system temp)
 PORT = int(os.getenv("PORT", "9200"))
 USE_LOCAL_EMBEDDINGS = bool(int(os.getenv("USE_LOCAL_EMBEDDINGS", "0")))
+LOCAL_EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBED_CACHE = bool(int(os.getenv("EMBED_CACHE", "1")))
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "200000"))
+PARSE_CACHE = bool(int(os.getenv("PARSE_CACHE", "1")))
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", "").strip()
+PARSE_CACHE_MAX_MB = int(os.getenv("PARSE_CACHE_MAX_MB", "1024"))
+# Prompt context: merge adjacent chunks, drop near-duplicates, pack into a token budget
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "1500"))  # 0 = no budget
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.85"))
+# Hybrid retrieval: BM25 over the same chunks, fused with vector hits (RRF)
+HYBRID_SEARCH = bool(int(os.getenv("HYBRID_SEARCH", "1")))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # per retriever, before fusion
+RRF_K = int(os.getenv("RRF_K", "60"))
+# Optional cross-encoder rerank for docling.retrieve
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))  # passages scored per query
+# Answers reused for similar queries that retrieve the same chunks
+ANSWER_CACHE = bool(int(os.getenv("ANSWER_CACHE", "1")))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2048"))
+ANSWER_CACHE_TTL_S = float(os.getenv("ANSWER_CACHE_TTL_S", "3600"))
+
+# Ingestion pipeline: per-stage concurrency limits (shared by all requests)
+CONVERT_WORKERS = int(os.getenv("CONVERT_WORKERS", str(os.cpu_count() or 2)))
+# Converters: "process" = one warm converter per worker process,
+# "thread" = CONVERTER_POOL_SIZE converters shared by CONVERT_WORKERS threads
+CONVERT_MODE = os.getenv("CONVERT_MODE", "process").strip().lower()
+CONVERTER_POOL_SIZE = int(os.getenv("CONVERTER_POOL_SIZE", str(CONVERT_WORKERS)))
+CONVERTER_PREWARM = bool(int(os.getenv("CONVERTER_PREWARM", "1")))
+WARM_ON_STARTUP = bool(int(os.getenv("WARM_ON_STARTUP", "1")))
+INGEST_READ_CONCURRENCY = int(os.getenv("INGEST_READ_CONCURRENCY", "4"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_BATCH_CHARS = int(os.getenv("EMBED_BATCH_CHARS", "200000"))
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "256"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "512"))
+INGEST_RETRIES = int(os.getenv("INGEST_RETRIES", "3"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "2"))
+UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "1"))
+INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "1"))
+
+# Query embedding micro-batching
+QUERY_BATCH_MAX = int(os.getenv("QUERY_BATCH_MAX", "32"))
+QUERY_BATCH_WAIT_MS = float(os.getenv("QUERY_BATCH_WAIT_MS", "5"))
+# Blocking work runs on dedicated pools (see rag/executors.py)
+NETWORK_WORKERS = int(os.getenv("NETWORK_WORKERS", "16"))  # watsonx calls
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))  # local embedder / reranker
+STORE_WORKERS = int(os.getenv("STORE_WORKERS", "4"))  # Chroma + SQLite indexes
+
+# docling.query_many: batch size cap and concurrent generations per request
+QUERY_MANY_MAX = int(os.getenv("QUERY_MANY_MAX", "256"))
+QUERY_MANY_CONCURRENCY = int(os.getenv("QUERY_MANY_CONCURRENCY", "4"))
 
 WATSONX_API_KEY = os.getenv("WATSONX_API_KEY", "")
 WATSONX_PROJECT_ID = os.getenv("WATSONX_PROJECT_ID", "")
 WATSONX_URL = os.getenv("WATSONX_URL", "https://us-south.ml.cloud.ibm.com")
 WATSONX_EMBED_MODEL = os.getenv("WATSONX_EMBED_MODEL", "sentence-transformers/all-minilm-l6-v2")
 WATSONX_LLM_MODEL = os.getenv("WATSONX_LLM_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
+# watsonx call policy: per-call timeouts, retries (bounded by a shared retry
+# budget) and a circuit breaker per API that skips watsonx while it is failing
+WX_EMBED_TIMEOUT_S = float(os.getenv("WX_EMBED_TIMEOUT_S", "10"))
+WX_GENERATE_TIMEOUT_S = float(os.getenv("WX_GENERATE_TIMEOUT_S", "60"))
+WX_RETRIES = int(os.getenv("WX_RETRIES", "1"))
+WX_RETRY_BUDGET_RATIO = float(os.getenv("WX_RETRY_BUDGET_RATIO", "0.2"))  # retries per call
+WX_BREAKER_FAILURES = int(os.getenv("WX_BREAKER_FAILURES", "3"))  # consecutive, to open
+WX_BREAKER_RESET_S = float(os.getenv("WX_BREAKER_RESET_S", "30"))  # open -> probe after
+WX_PROBE_INTERVAL_S = float(os.getenv("WX_PROBE_INTERVAL_S", "10"))  # 0 = no background probe
 
 # ---------- Docling ----------
-try:
-    from docling.document_converter import DocumentConverter
-
-    HAVE_DOCLING = True
-except Exception as e:  # pragma: no cover - best-effort import
-    HAVE_DOCLING = False
-    jlog("warn", msg=f"Docling not available: {e}")
-
-# ---------- IBM watsonx.ai SDK (genai) ----------
-HAVE_WX = False
-wx_client: Any = None
-if not USE_LOCAL_EMBEDDINGS:
+# Only check availability here; converters are built inside the conversion workers.
+HAVE_DOCLING = importlib.util.find_spec("docling") is not None
+if not HAVE_DOCLING:  # pragma: no cover - best-effort check
+    jlog("warn", msg="Docling not available: `pip install docling`")
+
+
+# ---------- Executors ----------
+network_pool = MeteredExecutor("network", NETWORK_WORKERS)
+inference_pool = MeteredExecutor("inference", INFERENCE_WORKERS)
+store_pool = MeteredExecutor("store", STORE_WORKERS)
+
+# ---------- watsonx circuit breakers ----------
+_wx_retry_budget = RetryBudget(ratio=WX_RETRY_BUDGET_RATIO)
+wx_embed_breaker = CircuitBreaker(
+    "wx-embed",
+    failure_threshold=WX_BREAKER_FAILURES,
+    reset_timeout_s=WX_BREAKER_RESET_S,
+    timeout_s=WX_EMBED_TIMEOUT_S,
+    retries=WX_RETRIES,
+    budget=_wx_retry_budget,
+    max_workers=NETWORK_WORKERS,
+)
+wx_generate_breaker = CircuitBreaker(
+    "wx-generate",
+    failure_threshold=WX_BREAKER_FAILURES,
+    reset_timeout_s=WX_BREAKER_RESET_S,
+    timeout_s=WX_GENERATE_TIMEOUT_S,
+    retries=WX_RETRIES,
+    budget=_wx_retry_budget,
+    max_workers=NETWORK_WORKERS,
+)
+
+
+# ---------- Lazy singletons (vector store, watsonx client, local embedder) ----------
+# Heavy clients are created on first use (or by the startup warm-up), never at import.
+_init_lock = threading.Lock()
+_collection: Any = None
+_wx_client: Any = None
+_wx_checked = False
+_local_embedder: Any = None
+_reranker: Any = None
+_chroma_client: Any = None
+_tenant_collections: Dict[str, Any] = {}
+_TENANT_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9_-]{0,47}")
+
+
+def _check_tenant(tenant: Optional[str]) -> str:
+    """Normalized tenant id ("" = default collection); rejects unsafe names."""
+    tenant = (tenant or "").strip()
+    if tenant and not _TENANT_RE.fullmatch(tenant):
+        raise ValueError(f"Invalid tenant {tenant!r} (letters, digits, '-' and '_' only)")
+    return tenant
+
+
+def _get_collection(tenant: str = "") -> Any:
+    """The shared collection, or the tenant's own `<COLLECTION_NAME>__<tenant>`."""
+    global _collection, _chroma_client
+    if tenant:
+        col = _tenant_collections.get(tenant)
+        if col is not None:
+            return col
+    elif _collection is not None:
+        return _collection
+    with _init_lock:
+        if _chroma_client is None:
+            import chromadb
+
+            if CHROMA_DIR:
+                _chroma_client = chromadb.PersistentClient(path=CHROMA_DIR)
+            else:
+                _chroma_client = chromadb.Client()
+        if not tenant:
+            if _collection is None:
+                _collection = _chroma_client.get_or_create_collection(name=COLLECTION_NAME)
+            return _collection
+        if tenant not in _tenant_collections:
+            _tenant_collections[tenant] = _chroma_client.get_or_create_collection(
+                name=f"{COLLECTION_NAME}__{tenant}"
+            )
+        return _tenant_collections[tenant]
+
+
+def _get_wx_client() -> Any:
+    """IBM watsonx.ai (genai SDK) client, or None when disabled/unavailable."""
+    global _wx_client, _wx_checked
+    if not _wx_checked:
+        with _init_lock:
+            if not _wx_checked:
+                _wx_client = _init_wx_client()
+                _wx_checked = True
+    return _wx_client
+
+
+def _init_wx_client() -> Any:
+    if USE_LOCAL_EMBEDDINGS:
+        return None
+    if not WATSONX_API_KEY:
+        jlog(
+            "warn",
+            msg="WATSONX_API_KEY not set; embeddings/LLM will use local fallback or be disabled",
+        )
+        return None
     try:
         from genai import Client
         from genai.credentials import Credentials
 
-        if WATSONX_API_KEY:
-            creds = Credentials(api_key=WATSONX_API_KEY, api_endpoint=WATSONX_URL)
-            wx_client = Client(credentials=creds)
-            HAVE_WX = True
-        else:
-            jlog(
-                "warn",
-                msg="WATSONX_API_KEY not set; embeddings/LLM will use local fallback or be disabled",
-            )
+        creds = Credentials(api_key=WATSONX_API_KEY, api_endpoint=WATSONX_URL)
+        return Client(credentials=creds)
     except Exception as e:  # pragma: no cover - optional dependency
         jlog("warn", msg=f"IBM genai SDK not available or failed to init: {e}")
+        return None
+
+
+def _get_local_embedder() -> Any:
+    """Local embedding fallback (only loaded when watsonx embeddings are unavailable)."""
+    global _local_embedder
+    if _local_embedder is None:
+        with _init_lock:
+            if _local_embedder is None:
+                from chromadb.utils import embedding_functions
+
+                _local_embedder = embedding_functions.SentenceTransformerEmbeddingFunction(
+                    model_name=LOCAL_EMBED_MODEL
+                )
+    return _local_embedder
+
+
+def _get_reranker() -> Any:
+    """Cross-encoder for docling.retrieve(rerank=true); loaded on first use."""
+    global _reranker
+    if _reranker is None:
+        with _init_lock:
+            if _reranker is None:
+                from sentence_transformers import CrossEncoder
+
+                _reranker = CrossEncoder(RERANK_MODEL)
+    return _reranker
+
+
+def _converter_version() -> str:
+    """Part of the parse-cache key, so a docling upgrade doesn't serve stale output."""
+    try:
+        return f"docling={importlib.metadata.version('docling')}"
+    except importlib.metadata.PackageNotFoundError:
+        return "docling=unknown"
+
+
+def _have_wx() -> bool:
+    return _get_wx_client() is not None
+
+
+def _warm_core() -> None:
+    """Build the vector store and whichever embedder will actually be used."""
+    _get_collection()
+    if not _have_wx():
+        _get_local_embedder()
+    _backfill_lexical()
+
 
-# ---------- Vector store ----------
+def _backfill_lexical(page: int = 1000) -> None:
+    """Index chunks stored before hybrid search was enabled (runs once, when empty)."""
+    if lexical is None or len(lexical):
+        return
+    col = _get_collection()
+    offset = 0
+    while True:
+        got = col.get(limit=page, offset=offset, include=["documents", "metadatas"])
+        ids = list(got.get("ids") or [])
+        if not ids:
+            break
+        lexical.add(ids, list(got.get("documents") or []), list(got.get("metadatas") or []))
+        offset += len(ids)
+    if offset:
+        jlog("docling.lexical_backfill", chunks=offset)
+
+
+def _readiness() -> Dict[str, Any]:
+    embedder_ready = _wx_client is not None or _local_embedder is not None
+    return {
+        "ready": _collection is not None and embedder_ready,
+        "components": {
+            "vector_store": _collection is not None,
+            "watsonx": (_wx_client is not None) if _wx_checked else None,
+            "watsonx_breakers": {b.name: b.state for b in (wx_embed_breaker, wx_generate_breaker)},
+            "local_embedder": _local_embedder is not None,
+            "converters": _converters_warm,
+            "docling": HAVE_DOCLING,
+        },
+    }
+
+
+# Embedding cache, stored next to the Chroma data when it is persistent
 if CHROMA_DIR:
-    client = chromadb.PersistentClient(path=CHROMA_DIR)
-else:
-    client = chromadb.Client()
-collection = client.get_or_create_collection(name=COLLECTION_NAME)
-
-# Local embedding fallback (only used when watsonx embeddings are unavailable)
-local_embedder = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
+    os.makedirs(CHROMA_DIR, exist_ok=True)
+embed_cache: Optional[EmbeddingCache] = None
+if EMBED_CACHE:
+    embed_cache = EmbeddingCache(
+        path=os.path.join(CHROMA_DIR, "embed_cache.sqlite") if CHROMA_DIR else ":memory:",
+        max_entries=EMBED_CACHE_MAX_ENTRIES,
+    )
+
+# Conversion output keyed by file hash, shared by docling.parse and docling.ingest
+parse_cache: Optional[ParseCache] = None
+if PARSE_CACHE:
+    parse_cache = ParseCache(
+        PARSE_CACHE_DIR or os.path.join(CHROMA_DIR or tempfile.gettempdir(), "docling_parse_cache"),
+        max_bytes=PARSE_CACHE_MAX_MB * 1024 * 1024,
+        options=_converter_version(),
+    )
+
+# Generated answers keyed by query embedding + retrieved chunk ids
+answer_cache: Optional[AnswerCache] = None
+if ANSWER_CACHE:
+    answer_cache = AnswerCache(
+        threshold=ANSWER_CACHE_THRESHOLD,
+        max_entries=ANSWER_CACHE_MAX_ENTRIES,
+        ttl_s=ANSWER_CACHE_TTL_S,
+    )
+
+# BM25 index over the stored chunks, updated together with the collection
+lexical: Optional[LexicalIndex] = None
+if HYBRID_SEARCH:
+    lexical = LexicalIndex(os.path.join(CHROMA_DIR, "lexical.sqlite") if CHROMA_DIR else ":memory:")
+
+# Per-source file/chunk hashes for incremental re-ingestion
+manifest = DocumentManifest(
+    os.path.join(CHROMA_DIR, "manifest.sqlite") if CHROMA_DIR else ":memory:"
 )
 
 
 # ---------- Helpers ----------
-def _chunk(text: str, size: int, overlap: int) -> Iterable[str]:
-    if size <= 0:
-        yield text
-        return
-    start = 0
-    n = len(text)
-    while start < n:
-        end = min(n, start + size)
-        yield text[start:end]
-        start = end - overlap if (end - overlap) > start else end
+_chunk_settings: Dict[str, Any] = dict(
+    size=CHUNK_SIZE,
+    overlap=CHUNK_OVERLAP,
+    max_tokens=CHUNK_MAX_TOKENS,
+    overlap_tokens=CHUNK_OVERLAP_TOKENS,
+    tokenizer=CHUNK_TOKENIZER,
+)
+_chunker: Optional[Chunker] = None
 
 
-def _file_too_large(content: bytes) -> bool:
-    return (len(content) / (1024 * 1024)) > MAX_FILE_MB
+def _chunk(text: str) -> Iterable[str]:
+    # Built on first use: an HF tokenizer (CHUNK_TOKENIZER) is a heavy load.
+    global _chunker
+    if _chunker is None:
+        with _init_lock:
+            if _chunker is None:
+                _chunker = make_chunker(CHUNKER, **_chunk_settings)
+    return _chunker(text)
 
 
 def _ensure_docling() -> None:
@@ -109,65 +410,503 @@ def _to_float_vectors(vectors_any: Sequence[Sequence[float | int]]) -> List[List
     return [[float(x) for x in row] for row in vectors_any]
 
 
-def _embed_texts(texts: List[str]) -> List[List[float]]:
-    """Embeddings via watsonx (preferred) or local sentence-transformers fallback."""
-    if HAVE_WX and not USE_LOCAL_EMBEDDINGS:
+def _wx_embed(wx_client: Any, texts: List[str]) -> List[List[float]]:
+    # Lazy imports for type-check friendliness
+    from genai.schema import TextEmbeddingParameters  # type: ignore
+
+    params = TextEmbeddingParameters()  # type: ignore[call-arg]
+    out = wx_client.embeddings.create(  # type: ignore[attr-defined]
+        model_id=WATSONX_EMBED_MODEL,
+        input=texts,
+        parameters=params,
+        project_id=WATSONX_PROJECT_ID or None,
+    )
+    results = getattr(out, "results", [])
+    raw_vecs: List[Sequence[float | int]] = [getattr(item, "embedding", []) for item in results]
+    return _to_float_vectors(raw_vecs)
+
+
+def _embed_backend(texts: List[str]) -> Tuple[str, List[List[float]]]:
+    """Embeddings via watsonx (preferred) or local sentence-transformers fallback.
+
+    While the watsonx breaker is open the local model is used straight away.
+    Returns the cache key (see `_embed_model_id`) of the model that actually
+    produced the vectors.
+    """
+    wx_client = _get_wx_client()
+    if wx_client is not None:
         try:
-            # Lazy imports for type-check friendliness
-            from genai.schema import TextEmbeddingParameters  # type: ignore
-
-            assert wx_client is not None
-            params = TextEmbeddingParameters()  # type: ignore[call-arg]
-            out = wx_client.embeddings.create(  # type: ignore[attr-defined]
-                model_id=WATSONX_EMBED_MODEL,
-                input=texts,
-                parameters=params,
-                project_id=WATSONX_PROJECT_ID or None,
-            )
-            results = getattr(out, "results", [])
-            raw_vecs: List[Sequence[float | int]] = [
-                getattr(item, "embedding", []) for item in results
-            ]
-            return _to_float_vectors(raw_vecs)
+            return f"wx:{WATSONX_EMBED_MODEL}", wx_embed_breaker.call(_wx_embed, wx_client, texts)
+        except CircuitOpenError:
+            pass
         except Exception as e:
             jlog("warn", msg=f"watsonx embeddings failed; falling back to local: {e}")
     # Fallback
-    local_vecs_any = local_embedder(texts)
+    local_vecs_any = _get_local_embedder()(texts)
     # Cast to assure mypy that list[ndarray] is compatible with Sequence[Sequence[...]]
-    return _to_float_vectors(cast(Sequence[Sequence[float | int]], local_vecs_any))
+    return f"local:{LOCAL_EMBED_MODEL}", _to_float_vectors(
+        cast(Sequence[Sequence[float | int]], local_vecs_any)
+    )
+
+
+def _embed_model_id() -> str:
+    if _have_wx():
+        return f"wx:{WATSONX_EMBED_MODEL}"
+    return f"local:{LOCAL_EMBED_MODEL}"
+
+
+def _embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed `texts`, serving repeats from the embedding cache."""
+    if embed_cache is None:
+        return _embed_backend(texts)[1]
+
+    model = _embed_model_id()
+    cached = embed_cache.get_many(model, texts)
+    missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+    fresh: Dict[str, List[float]] = {}
+    if missing:
+        used, vecs = _embed_backend(missing)
+        fresh = dict(zip(missing, vecs))
+        # Don't cache local-fallback vectors under the watsonx model id.
+        if used == model:
+            embed_cache.put_many(model, missing, vecs)
+    return [v if v is not None else fresh[t] for t, v in zip(texts, cached)]
+
+
+LLM_NOT_CONFIGURED = (
+    "[LLM not configured] Set WATSONX_* env or run with USE_LOCAL_EMBEDDINGS=1 (no gen)."
+)
+LLM_UNAVAILABLE = "[LLM unavailable] watsonx is failing; generation is paused until it recovers."
+
+
+def _gen_params(max_new_tokens: int, temperature: float) -> Any:
+    from genai.schema import TextGenerationParameters  # type: ignore
+
+    return TextGenerationParameters(  # type: ignore[call-arg]
+        decoding_method=cast(Any, "greedy"),
+        max_new_tokens=max_new_tokens,
+        temperature=temperature,
+    )
+
+
+def _wx_generate(wx_client: Any, prompt: str, max_new_tokens: int, temperature: float) -> str:
+    resp = wx_client.text.generation.create(  # type: ignore[attr-defined]
+        model_id=WATSONX_LLM_MODEL,
+        input=prompt,
+        parameters=_gen_params(max_new_tokens, temperature),
+        project_id=WATSONX_PROJECT_ID or None,
+    )
+    return str(getattr(resp.results[0], "generated_text", ""))  # type: ignore[index]
 
 
 def _generate_answer(prompt: str, *, max_new_tokens: int = 512, temperature: float = 0.2) -> str:
-    if HAVE_WX:
+    wx_client = _get_wx_client()
+    if wx_client is not None:
         try:
-            from genai.schema import TextGenerationParameters  # type: ignore
-
-            assert wx_client is not None
-            params = TextGenerationParameters(  # type: ignore[call-arg]
-                decoding_method=cast(Any, "greedy"),
-                max_new_tokens=max_new_tokens,
-                temperature=temperature,
-            )
-            resp = wx_client.text.generation.create(  # type: ignore[attr-defined]
-                model_id=WATSONX_LLM_MODEL,
-                input=prompt,
-                parameters=params,
-                project_id=WATSONX_PROJECT_ID or None,
+            return wx_generate_breaker.call(
+                _wx_generate, wx_client, prompt, max_new_tokens, temperature
             )
-            return getattr(resp.results[0], "generated_text", "")  # type: ignore[index]
+        except CircuitOpenError:
+            return LLM_UNAVAILABLE
         except Exception as e:
             return f"[LLM error] {e}"
-    return "[LLM not configured] Set WATSONX_* env or run with USE_LOCAL_EMBEDDINGS=1 (no gen)."
+    return LLM_NOT_CONFIGURED
+
+
+def _generate_stream(
+    prompt: str, *, max_new_tokens: int = 512, temperature: float = 0.2
+) -> Iterator[str]:
+    """Like `_generate_answer`, but yields text pieces as watsonx produces them.
+
+    Goes through the generation breaker too, without its timeout/retries: a
+    stream that has started cannot be replayed. Closing the generator (the
+    client went away) closes the watsonx stream as well.
+    """
+    wx_client = _get_wx_client()
+    if wx_client is None:
+        yield LLM_NOT_CONFIGURED
+        return
+    if not wx_generate_breaker.allow():
+        yield LLM_UNAVAILABLE
+        return
+    try:
+        stream = wx_client.text.generation.create_stream(  # type: ignore[attr-defined]
+            model_id=WATSONX_LLM_MODEL,
+            input=prompt,
+            parameters=_gen_params(max_new_tokens, temperature),
+            project_id=WATSONX_PROJECT_ID or None,
+        )
+        try:
+            for event in stream:
+                for result in getattr(event, "results", None) or []:
+                    piece = getattr(result, "generated_text", "")
+                    if piece:
+                        yield piece
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+    except GeneratorExit:
+        # abandoned by the consumer, but watsonx was answering
+        wx_generate_breaker.record_success()
+        raise
+    except Exception:
+        wx_generate_breaker.record_failure()
+        raise
+    wx_generate_breaker.record_success()
+
+
+def _probe_wx() -> Dict[str, str]:
+    """Trial call for every breaker whose reset timeout has passed."""
+    wx_client = _get_wx_client()
+    if wx_client is None:
+        return {}
+    probes: List[Tuple[CircuitBreaker, Callable[[], Any]]] = [
+        (wx_embed_breaker, lambda: _wx_embed(wx_client, ["ping"])),
+        (wx_generate_breaker, lambda: _wx_generate(wx_client, "ping", 1, 0.0)),
+    ]
+    states: Dict[str, str] = {}
+    for breaker, probe in probes:
+        if not breaker.probe_due():
+            continue
+        try:
+            breaker.call(probe)
+        except Exception as e:
+            jlog("warn", msg=f"{breaker.name} probe failed: {e}")
+        states[breaker.name] = breaker.state
+    return states
+
+
+async def _iterate_in_thread(
+    gen: Iterator[str], pool: MeteredExecutor
+) -> AsyncGenerator[str, None]:
+    """Drive a blocking iterator on a `pool` worker, yielding items on the loop.
+
+    When the consumer stops early (closed or cancelled, e.g. the client
+    disconnected), the worker stops pulling at the next item and closes `gen`.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[Tuple[str, Any]] = asyncio.Queue()
+    stop = threading.Event()
+
+    def pump() -> None:
+        try:
+            for item in gen:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, ("item", item))
+            loop.call_soon_threadsafe(queue.put_nowait, ("end", None))
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, ("error", e))
+        finally:
+            close = getattr(gen, "close", None)
+            if close is not None:
+                close()
+
+    task = asyncio.ensure_future(pool.run(pump))
+    try:
+        while True:
+            kind, value = await queue.get()
+            if kind == "item":
+                yield value
+            elif kind == "error":
+                raise value
+            else:
+                break
+        await task
+    finally:
+        stop.set()
+        if not task.done():
+            # not started yet: drop it; running: it exits at the next item
+            task.cancel()
+
+
+MetaVal = Union[str, int, float, bool, None]
+
+
+def _clean_meta(m: Mapping[str, Any]) -> Dict[str, MetaVal]:
+    """Coerce metadata values to supported scalar types for Chroma."""
+    clean: Dict[str, MetaVal] = {}
+    for k, v in m.items():
+        if isinstance(v, (str, int, float, bool)) or v is None:
+            clean[k] = v
+        else:
+            clean[k] = str(v)
+    return clean
+
+
+# ---------- Ingestion pipeline ----------
+_convert_executor: Optional[Executor] = None
+_converters_warm = False
+_convert_stats: Dict[str, float] = {
+    "conversions": 0,
+    "pool_wait_ms_total": 0.0,
+    "pool_wait_ms_max": 0.0,
+}
+
+
+def _get_convert_executor() -> Executor:
+    global _convert_executor
+    if _convert_executor is None:
+        workers = max(1, CONVERT_WORKERS)
+        if CONVERT_MODE == "thread":
+            init_pool(CONVERTER_POOL_SIZE, warm=False)
+            _convert_executor = ThreadPoolExecutor(workers, thread_name_prefix="docling-convert")
+        else:
+            # spawn, not fork: workers start while other threads are importing
+            # torch/chromadb, and a fork taken mid-import can deadlock the child.
+            _convert_executor = ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_pool,
+                initargs=(1,),
+            )
+    return _convert_executor
+
+
+async def _prewarm_converters() -> None:
+    """Start the conversion workers and build their converters before traffic arrives."""
+    global _converters_warm
+    loop = asyncio.get_running_loop()
+    executor = _get_convert_executor()
+    if CONVERT_MODE == "thread":
+        await loop.run_in_executor(executor, get_pool().warm)
+    else:
+        warmups = [loop.run_in_executor(executor, warm_worker) for _ in range(CONVERT_WORKERS)]
+        await asyncio.gather(*warmups)
+    _converters_warm = True
+    jlog("docling.converters.warm", mode=CONVERT_MODE, workers=CONVERT_WORKERS)
+
+
+async def _convert(filename: str, path: str, return_images: bool = False) -> Converted:
+    """Run Docling conversion in the conversion executor (keeps the event loop free)."""
+    loop = asyncio.get_running_loop()
+    # Wall-clock submit time: the worker may be another process.
+    fn = partial(convert_document, filename, path, return_images, submitted=time.time())
+    converted = await loop.run_in_executor(_get_convert_executor(), fn)
+    _convert_stats["conversions"] += 1
+    _convert_stats["pool_wait_ms_total"] += converted.pool_wait_ms
+    _convert_stats["pool_wait_ms_max"] = max(
+        _convert_stats["pool_wait_ms_max"], converted.pool_wait_ms
+    )
+    return converted
+
+
+async def _convert_cached(
+    spooled: SpooledUpload, return_images: bool = False
+) -> Tuple[Converted, bool]:
+    """Conversion output for `spooled`, served from the parse cache when possible."""
+    if parse_cache is not None:
+        hit = await store_pool.run(parse_cache.get, spooled.sha256, images=return_images)
+        if hit is not None:
+            hit.filename = spooled.filename
+            return hit, True
+    converted = await _convert(spooled.filename, spooled.path, return_images)
+    if parse_cache is not None:
+        await store_pool.run(parse_cache.put, spooled.sha256, converted, images=return_images)
+    return converted, False
+
+
+async def _convert_text(spooled: SpooledUpload) -> str:
+    return (await _convert_cached(spooled))[0].text
+
+
+async def _spool_form(request: Request) -> SpooledForm:
+    """Spool the request's form files to disk while it arrives (see `uploads.py`)."""
+    return await spool_form(
+        request.stream(),
+        request.headers.get("content-type", ""),
+        max_bytes=MAX_FILE_MB * 1024 * 1024,
+        directory=UPLOAD_DIR,
+    )
+
+
+def _form_bool(form: SpooledForm, name: str) -> bool:
+    return form.fields.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _form_schema(**properties: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenAPI request body for the endpoints that parse their form themselves."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {"schema": {"type": "object", "properties": properties}}
+            },
+        }
+    }
+
+
+def _embed_pool() -> MeteredExecutor:
+    """watsonx embeddings wait on the network; the local model needs CPU."""
+    wx_possible = bool(WATSONX_API_KEY) and not USE_LOCAL_EMBEDDINGS
+    wx_healthy = wx_embed_breaker.state != BREAKER_OPEN
+    if wx_possible and wx_healthy and (not _wx_checked or _wx_client is not None):
+        return network_pool
+    return inference_pool
+
+
+async def _embed_async(texts: List[str]) -> List[List[float]]:
+    return await _embed_pool().run(_embed_texts, texts)
+
+
+def _upsert_batch(
+    texts: List[str],
+    vecs: List[List[float]],
+    ids: List[str],
+    metas: List[Dict[str, Any]],
+    tenant: str = "",
+) -> None:
+    _get_collection(tenant).upsert(
+        documents=texts,
+        embeddings=cast(List[Sequence[float]], vecs),
+        ids=ids,
+        metadatas=cast(Any, [_clean_meta(m) for m in metas]),
+    )
+
+
+async def _upsert_async(
+    texts: List[str],
+    vecs: List[List[float]],
+    ids: List[str],
+    metas: List[Dict[str, Any]],
+    tenant: str,
+) -> None:
+    await store_pool.run(_upsert_batch, texts, vecs, ids, metas, tenant)
+    if lexical is not None:
+        await store_pool.run(lexical.add, ids, texts, metas, tenant)
+    if answer_cache is not None:
+        answer_cache.invalidate(ids)
+
+
+async def _delete_async(ids: List[str], tenant: str) -> None:
+    await store_pool.run(lambda: _get_collection(tenant).delete(ids=ids))
+    if lexical is not None:
+        await store_pool.run(lexical.delete, ids, tenant)
+    if answer_cache is not None:
+        answer_cache.invalidate(ids)
+
+
+async def _purge_source_async(source: str, tenant: str) -> None:
+    await store_pool.run(lambda: _get_collection(tenant).delete(where={"source": source}))
+    if lexical is not None:
+        await store_pool.run(lexical.delete_source, source, tenant)
+    if answer_cache is not None:
+        answer_cache.invalidate_source(source_key(source, tenant))
+
+
+pipeline = IngestPipeline(
+    convert=_convert_text,
+    chunk=_chunk,
+    embed=_embed_async,
+    upsert=_upsert_async,
+    delete=_delete_async,
+    purge=_purge_source_async,
+    manifest=manifest,
+    limits=PipelineLimits(
+        read=INGEST_READ_CONCURRENCY,
+        convert=CONVERT_WORKERS,
+        embed=EMBED_CONCURRENCY,
+        upsert=UPSERT_CONCURRENCY,
+        embed_batch=EMBED_BATCH_SIZE,
+        embed_batch_chars=EMBED_BATCH_CHARS,
+        upsert_batch=UPSERT_BATCH_SIZE,
+        queue_size=INGEST_QUEUE_SIZE,
+        retries=INGEST_RETRIES,
+    ),
+    options=chunker_signature(CHUNKER, **_chunk_settings),
+    cpu=inference_pool.run,
+    store=store_pool.run,
+)
+jobs = JobQueue(workers=INGEST_JOB_WORKERS)
+query_batcher = EmbeddingBatcher(
+    _embed_async, max_batch=QUERY_BATCH_MAX, max_wait_ms=QUERY_BATCH_WAIT_MS
+)
 
 
 # ---------- Schemas ----------
 class QueryPayload(BaseModel):
     query: str = Field(..., description="User question")
     k: int = Field(4, description="Top K passages to retrieve")
+    tenant: Optional[str] = Field(None, description="Query this tenant's collection")
+    where: Dict[str, Any] = Field(
+        default_factory=dict,
+        description='Metadata filter, e.g. {"source": "sow.pdf", "doc_type": ["msa", "sow"]}',
+    )
+
+
+def _chroma_where(filters: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """Equality per key (a list means any of); a dict with `$` operators is passed through."""
+    if not filters:
+        return None
+    if any(key.startswith("$") for key in filters):
+        return dict(filters)
+    clauses = [
+        {key: {"$in": list(value)} if isinstance(value, (list, tuple)) else value}
+        for key, value in filters.items()
+    ]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class RetrievePayload(QueryPayload):
+    rerank: bool = Field(False, description="Rescore candidates with a cross-encoder")
+
+
+class QueryManyPayload(BaseModel):
+    queries: List[str] = Field(..., description="User questions")
+    k: int = Field(4, description="Top K passages to retrieve per question")
+    tenant: Optional[str] = Field(None, description="Query this tenant's collection")
+    where: Dict[str, Any] = Field(default_factory=dict, description="Metadata filter (all items)")
+
+
+class JobPayload(BaseModel):
+    job_id: str = Field(..., description="Id returned by docling.ingest in background mode")
 
 
 # ---------- App ----------
-app = FastAPI(title="Docling MCP Server", version="1.0.0")
+async def _warm_in_background() -> None:
+    try:
+        await inference_pool.run(_warm_core)
+        jlog("docling.warm", **_readiness()["components"])
+    except Exception as e:
+        jlog("warn", msg=f"warm-up failed: {e}")
+
+
+async def _probe_loop() -> None:
+    """Close open watsonx breakers from the background, so no request pays for the trial."""
+    while True:
+        await asyncio.sleep(WX_PROBE_INTERVAL_S)
+        try:
+            states = await network_pool.run(_probe_wx)
+            if states:
+                jlog("docling.wx_probe", **states)
+        except Exception as e:
+            jlog("warn", msg=f"watsonx probe failed: {e}")
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    warmups: List[asyncio.Task[None]] = []
+    if WARM_ON_STARTUP:
+        warmups.append(asyncio.create_task(_warm_in_background()))
+    if HAVE_DOCLING and CONVERTER_PREWARM:
+        warmups.append(asyncio.create_task(_prewarm_converters()))
+    if WATSONX_API_KEY and WX_PROBE_INTERVAL_S > 0:
+        warmups.append(asyncio.create_task(_probe_loop()))
+    yield
+    for t in warmups:
+        t.cancel()
+    await jobs.stop()
+    await query_batcher.stop()
+    for pool in (network_pool, inference_pool, store_pool):
+        pool.shutdown()
+    for breaker in (wx_embed_breaker, wx_generate_breaker):
+        breaker.shutdown()
+    if _convert_executor is not None:
+        _convert_executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Docling MCP Server", version="1.0.0", lifespan=_lifespan)
 
 
 @app.get("/health")
@@ -175,206 +914,677 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
-@app.get("/tools")
-def tools() -> Dict[str, Any]:
+@app.get("/ready")
+def ready(response: Response) -> Dict[str, Any]:
+    """Readiness: 200 once the vector store and an embedder are initialized, else 503."""
+    state = _readiness()
+    if not state["ready"]:
+        response.status_code = 503
+    return state
+
+
+def _converter_metrics() -> Dict[str, Any]:
+    n = _convert_stats["conversions"]
+    out: Dict[str, Any] = {
+        "mode": CONVERT_MODE,
+        "conversions": int(n),
+        "avg_pool_wait_ms": round(_convert_stats["pool_wait_ms_total"] / n, 2) if n else 0.0,
+        "max_pool_wait_ms": round(_convert_stats["pool_wait_ms_max"], 2),
+    }
+    if CONVERT_MODE == "thread" and _convert_executor is not None:
+        out["pool"] = get_pool().stats()
+    return out
+
+
+@app.get("/metrics")
+def metrics() -> Dict[str, Any]:
     return {
-        "tools": [
-            {
-                "name": "docling.parse",
-                "description": "Parse a single PDF/image and return extracted text (and base64 images).",
-                "schema": {
-                    "type": "object",
-                    "properties": {"return_images": {"type": "boolean", "default": False}},
-                    "required": [],
+        "embed_cache": embed_cache.stats() if embed_cache is not None else None,
+        "ingest_jobs_pending": jobs.pending(),
+        "query_batcher": query_batcher.stats(),
+        "converters": _converter_metrics(),
+        "executors": {p.name: p.stats() for p in (network_pool, inference_pool, store_pool)},
+        "watsonx": {b.name: b.stats() for b in (wx_embed_breaker, wx_generate_breaker)},
+        "parse_cache": parse_cache.stats() if parse_cache is not None else None,
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+        "lexical_index": lexical.stats() if lexical is not None else None,
+        "context": {
+            **_context_totals,
+            "tokens_saved": _context_totals["tokens_in"] - _context_totals["tokens_out"],
+        },
+    }
+
+
+_QUERY_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string"},
+        "k": {"type": "integer", "default": 4},
+        "tenant": {"type": "string"},
+        "where": {"type": "object"},
+    },
+    "required": ["query"],
+}
+
+
+@app.get("/tools")
+def tools(request: Request) -> Response:
+    return catalog_response(
+        request,
+        {
+            "tools": [
+                {
+                    "name": "docling.parse",
+                    "description": "Parse a single PDF/image and return extracted text (and base64 images).",
+                    "schema": {
+                        "type": "object",
+                        "properties": {"return_images": {"type": "boolean", "default": False}},
+                        "required": [],
+                    },
                 },
-            },
-            {
-                "name": "docling.ingest",
-                "description": "Parse & ingest PDFs/images into the vector index.",
-                "schema": {
-                    "type": "object",
-                    "properties": {"metas": {"type": "object"}},
-                    "required": [],
+                {
+                    "name": "docling.ingest",
+                    "description": "Parse & ingest PDFs/images into the vector index.",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "metas": {"type": "object"},
+                            "tenant": {"type": "string"},
+                            "background": {"type": "boolean", "default": False},
+                        },
+                        "required": [],
+                    },
                 },
-            },
-            {
-                "name": "docling.query",
-                "description": "RAG query over ingested documents.",
-                "schema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string"},
-                        "k": {"type": "integer", "default": 4},
+                {
+                    "name": "docling.job",
+                    "description": "Progress of a background docling.ingest job.",
+                    "schema": {
+                        "type": "object",
+                        "properties": {"job_id": {"type": "string"}},
+                        "required": ["job_id"],
                     },
-                    "required": ["query"],
                 },
-            },
-        ]
-    }
+                {
+                    "name": "docling.query_stream",
+                    "description": "Streaming RAG query (NDJSON: sources, then answer tokens).",
+                    "schema": _QUERY_SCHEMA,
+                },
+                {
+                    "name": "docling.retrieve",
+                    "description": "Ranked passages with scores and metadata (no LLM call).",
+                    "schema": {
+                        **_QUERY_SCHEMA,
+                        "properties": {
+                            **_QUERY_SCHEMA["properties"],
+                            "rerank": {"type": "boolean", "default": False},
+                        },
+                    },
+                },
+                {
+                    "name": "docling.query_many",
+                    "description": "Batch RAG query: one embedding call and one vector search.",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "queries": {"type": "array", "items": {"type": "string"}},
+                            "k": {"type": "integer", "default": 4},
+                            "tenant": {"type": "string"},
+                            "where": {"type": "object"},
+                        },
+                        "required": ["queries"],
+                    },
+                },
+                {
+                    "name": "docling.query",
+                    "description": "RAG query over ingested documents.",
+                    "schema": _QUERY_SCHEMA,
+                },
+            ]
+        },
+    )
 
 
-@app.post("/call/docling.parse")
-async def call_parse(
-    request: Request,
-    return_images: bool = Form(False),
-    file: UploadFile = File(...),
-) -> Dict[str, Any]:
+@app.post(
+    "/call/docling.parse",
+    openapi_extra=_form_schema(
+        file={"type": "string", "format": "binary"}, return_images={"type": "boolean"}
+    ),
+)
+async def call_parse(request: Request, response: Response) -> Dict[str, Any]:
     started = time.time()
     corr = request.headers.get("x-correlation-id", str(uuid.uuid4()))
     try:
         _ensure_docling()
-        content = await file.read()
-        if _file_too_large(content):
-            raise ValueError(f"File exceeds {MAX_FILE_MB} MB limit")
-
-        converter = DocumentConverter()
-        # Use Any for the conversion result to keep mypy happy across docling versions
-        result: Any = converter.convert(cast(Any, io.BytesIO(content)), cast(Any, file.filename))
-
-        text = result.document.export_to_markdown()
-        images_b64: List[str] = []
-        if return_images and getattr(result, "images", None):
-            for img in result.images:  # type: ignore[attr-defined]
-                buf = io.BytesIO()
-                img.pil_image.save(buf, format="PNG")
-                images_b64.append(base64.b64encode(buf.getvalue()).decode("utf-8"))
+        form = await _spool_form(request)
+        try:
+            uploads = form.files.get("file") or []
+            if len(uploads) != 1:
+                raise ValueError("Expected exactly one 'file' upload")
+            spooled = uploads[0]
+            return_images = _form_bool(form, "return_images")
+            converted, cached = await _convert_cached(spooled, return_images)
+        finally:
+            form.remove()
+        response.headers["X-Cache"] = "HIT" if cached else "MISS"
+        response.headers["ETag"] = f'"{spooled.sha256}-{int(return_images)}"'
+        text = converted.text
+        images_b64 = [base64.b64encode(img).decode("utf-8") for img in converted.images]
 
         payload = {
-            "filename": file.filename,
+            "filename": spooled.filename,
             "text": text,
             "images": images_b64,
+            "cached": cached,
             "latency_ms": int((time.time() - started) * 1000),
             "correlation_id": corr,
         }
-        jlog("docling.parse", corr=corr, file=file.filename, latency_ms=payload["latency_ms"])
+        jlog(
+            "docling.parse",
+            corr=corr,
+            file=spooled.filename,
+            cached=cached,
+            latency_ms=payload["latency_ms"],
+        )
         return payload
     except Exception as e:
         jlog("error", tool="docling.parse", corr=corr, error=str(e))
         raise HTTPException(status_code=400, detail=f"{corr}: {e}") from e
 
 
-@app.post("/call/docling.ingest")
-async def call_ingest(
-    request: Request,
-    metas: Optional[str] = Form(None),
-    files: List[UploadFile] = File(...),
+def _spooled_reader(spooled: SpooledUpload) -> ReadFn:
+    async def read() -> SpooledUpload:
+        return spooled
+
+    return read
+
+
+async def _run_ingest(
+    sources: List[IngestSource], corr: str, started: float, stats: Optional[IngestStats] = None
 ) -> Dict[str, Any]:
+    stats = await pipeline.run(sources, stats)
+    if stats.files_failed == len(sources):
+        raise ValueError("; ".join(stats.errors) or "Ingestion failed")
+    if stats.files_converted and not stats.chunks_total:
+        raise ValueError("No text extracted from provided files")
+
+    payload = {
+        "ingested_docs": stats.files_ingested,
+        "skipped_docs": stats.files_skipped,
+        "chunks": stats.chunks_upserted,
+        "unchanged_chunks": stats.chunks_skipped,
+        "deleted_chunks": stats.chunks_deleted,
+        "failed_docs": stats.files_failed,
+        "failed_chunks": stats.chunks_failed,
+        "errors": stats.errors,
+        "latency_ms": int((time.time() - started) * 1000),
+        "correlation_id": corr,
+    }
+    jlog(
+        "docling.ingest",
+        corr=corr,
+        docs=payload["ingested_docs"],
+        chunks=payload["chunks"],
+        skipped_docs=payload["skipped_docs"],
+        deleted_chunks=payload["deleted_chunks"],
+        failed_docs=payload["failed_docs"],
+        latency_ms=payload["latency_ms"],
+    )
+    return payload
+
+
+@app.post(
+    "/call/docling.ingest",
+    openapi_extra=_form_schema(
+        files={"type": "array", "items": {"type": "string", "format": "binary"}},
+        metas={"type": "string", "description": "JSON object added to every chunk's metadata"},
+        tenant={"type": "string"},
+        background={"type": "boolean"},
+    ),
+)
+async def call_ingest(request: Request, response: Response) -> Dict[str, Any]:
     started = time.time()
     corr = request.headers.get("x-correlation-id", str(uuid.uuid4()))
+    queued = False
+    form: Optional[SpooledForm] = None
     try:
         _ensure_docling()
+        form = await _spool_form(request)
+        spooled = form.files.get("files") or []
+        if not spooled:
+            raise ValueError("Expected at least one 'files' upload")
+        metas = form.fields.get("metas")
         meta_common = json.loads(metas) if metas else {}
-        converter = DocumentConverter()
-
-        texts: List[str] = []
-        ids: List[str] = []
-        metadatas_raw: List[Dict[str, Any]] = []
-
-        for f in files:
-            content = await f.read()
-            if _file_too_large(content):
-                raise ValueError(f"{f.filename} exceeds {MAX_FILE_MB} MB limit")
-
-            result: Any = converter.convert(cast(Any, io.BytesIO(content)), cast(Any, f.filename))
-            md_text = result.document.export_to_markdown()
-
-            for idx, chunk in enumerate(_chunk(md_text, CHUNK_SIZE, CHUNK_OVERLAP)):
-                texts.append(chunk)
-                ids.append(f"{f.filename}:{idx}")
-                metadatas_raw.append({"source": f.filename, **meta_common})
-
-        if not texts:
-            raise ValueError("No text extracted from provided files")
-
-        vecs = _embed_texts(texts)
-
-        # Coerce metadata values to supported scalar types for Chroma
-        MetaVal = Union[str, int, float, bool, None]
-        metadatas: List[Mapping[str, MetaVal]] = []
-        for m in metadatas_raw:
-            clean: Dict[str, MetaVal] = {}
-            for k, v in m.items():
-                if isinstance(v, (str, int, float, bool)) or v is None:
-                    clean[k] = v
-                else:
-                    clean[k] = str(v)
-            metadatas.append(clean)
-
-        collection.upsert(
-            documents=texts,
-            embeddings=cast(List[Sequence[float]], vecs),
-            ids=ids,
-            metadatas=cast(Any, metadatas),
-        )
-
-        payload = {
-            "ingested_docs": len(set(cast(str, m.get("source", "")) for m in metadatas_raw)),
-            "chunks": len(texts),
-            "latency_ms": int((time.time() - started) * 1000),
+        tenant = _check_tenant(form.fields.get("tenant"))
+        if tenant:
+            meta_common["tenant"] = tenant
+
+        sources = [
+            IngestSource(
+                filename=sp.filename,
+                read=_spooled_reader(sp),
+                meta=meta_common,
+                namespace=tenant,
+            )
+            for sp in spooled
+        ]
+        if not _form_bool(form, "background"):
+            return await _run_ingest(sources, corr, started)
+
+        async def _job(job: Job) -> Dict[str, Any]:
+            try:
+                return await _run_ingest(sources, corr, time.time(), job.stats)
+            except Exception as e:
+                jlog("error", tool="docling.ingest", corr=corr, job_id=job.id, error=str(e))
+                raise
+            finally:
+                for sp in spooled:
+                    sp.remove()
+
+        job = jobs.submit(_job)
+        queued = True
+        jlog("docling.ingest.queued", corr=corr, job_id=job.id, files=len(sources))
+        response.status_code = 202
+        return {
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/jobs/{job.id}",
             "correlation_id": corr,
         }
-        jlog(
-            "docling.ingest",
-            corr=corr,
-            docs=payload["ingested_docs"],
-            chunks=payload["chunks"],
-            latency_ms=payload["latency_ms"],
-        )
-        return payload
     except Exception as e:
         jlog("error", tool="docling.ingest", corr=corr, error=str(e))
         raise HTTPException(status_code=400, detail=f"{corr}: {e}") from e
+    finally:
+        # The pipeline removes each file once converted; this catches the rest.
+        if form is not None and not queued:
+            form.remove()
+
+
+def _job_or_404(job_id: str) -> Dict[str, Any]:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.as_dict()
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Dict[str, Any]:
+    return _job_or_404(job_id)
+
+
+@app.post("/call/docling.job")
+def call_job(payload: JobPayload) -> Dict[str, Any]:
+    return _job_or_404(payload.job_id)
 
 
 class _QueryOut(BaseModel):
     answer: str
     sources: List[Dict[str, Any]] = []
+    cached: bool = False
+    context: Dict[str, Any] = {}
     latency_ms: int
     correlation_id: str
 
 
+@dataclass
+class _Retrieval:
+    qvec: List[float]
+    ids: List[str]
+    docs: List[str]
+    sources: List[Dict[str, Any]]
+    epoch: int = 0
+    # Per passage: vector distance, BM25 score, fused score (None when not applicable)
+    scores: List[Dict[str, Optional[float]]] = field(default_factory=list)
+
+
+def _row(res: Mapping[str, Any], key: str, i: int = 0) -> List[Any]:
+    """Row `i` of a Chroma `query` result field (one row per query embedding)."""
+    rows = cast(List[List[Any]], res.get(key) or [])
+    return list(rows[i]) if i < len(rows) else []
+
+
+def _search(
+    queries: Sequence[str],
+    qvecs: Sequence[List[float]],
+    k: int,
+    tenant: str,
+    where: Optional[Mapping[str, Any]],
+    epoch: int = 0,
+) -> List[_Retrieval]:
+    """Top-k passages for each query with one `collection.query` for all of them.
+
+    Only the tenant's collection is searched, restricted by the `where` filter.
+    With hybrid search, vector and BM25 candidates are fused with RRF; chunks
+    found only lexically are fetched from the collection by id (one `get` for
+    the whole batch, under the same filter) before fusion.
+    """
+    chroma_where = _chroma_where(where or {})
+    n = max(k, HYBRID_CANDIDATES) if lexical is not None else k
+    col = _get_collection(tenant)
+    res = col.query(
+        query_embeddings=cast(List[Sequence[float]], list(qvecs)), n_results=n, where=chroma_where
+    )
+
+    vector: List[List[str]] = []
+    distances: List[Dict[str, float]] = []
+    found: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for i in range(len(queries)):
+        ids = _row(res, "ids", i)
+        metas = [dict(m or {}) for m in _row(res, "metadatas", i)]
+        for cid, doc, meta in zip(ids, _row(res, "documents", i), metas):
+            found[cid] = (doc, meta)
+        vector.append(ids)
+        distances.append(dict(zip(ids, map(float, _row(res, "distances", i)))))
+
+    bm25: List[Dict[str, float]] = [{} for _ in queries]
+    if lexical is None:
+        # Without fusion, rank by vector distance alone (score = 1 / (1 + distance)).
+        fused = [
+            [(cid, 1.0 / (1.0 + dist.get(cid, 0.0))) for cid in ids[:k]]
+            for ids, dist in zip(vector, distances)
+        ]
+    else:
+        bm25 = [dict(lexical.search(q, n, namespace=tenant)) for q in queries]
+        lexical_hits = [list(hits) for hits in bm25]
+        missing = sorted({cid for hits in lexical_hits for cid in hits if cid not in found})
+        if missing:
+            got = col.get(ids=missing, where=chroma_where, include=["documents", "metadatas"])
+            for cid, doc, meta in zip(
+                got.get("ids") or [], got.get("documents") or [], got.get("metadatas") or []
+            ):
+                found[cid] = (doc, dict(meta or {}))
+        fused = [
+            rrf([ids, [c for c in hits if c in found]], k=RRF_K)[:k]
+            for ids, hits in zip(vector, lexical_hits)
+        ]
+
+    return [
+        _Retrieval(
+            qvec=qvec,
+            ids=[cid for cid, _ in ranked],
+            docs=[found[cid][0] for cid, _ in ranked],
+            sources=[found[cid][1] for cid, _ in ranked],
+            epoch=epoch,
+            scores=[
+                {"score": score, "distance": dist.get(cid), "bm25": lex.get(cid)}
+                for cid, score in ranked
+            ],
+        )
+        for qvec, ranked, dist, lex in zip(qvecs, fused, distances, bm25)
+    ]
+
+
+async def _retrieve(
+    query: str, k: int, tenant: Optional[str] = None, where: Optional[Mapping[str, Any]] = None
+) -> _Retrieval:
+    """Top-k passages (with ids and metadata) for `query`; see `_search`."""
+    tenant = _check_tenant(tenant)
+    epoch = answer_cache.epoch() if answer_cache is not None else 0
+    qvec = await query_batcher.embed(query)
+    return (await store_pool.run(_search, [query], [qvec], k, tenant, where, epoch))[0]
+
+
+_context_totals: Dict[str, int] = {"requests": 0, "tokens_in": 0, "tokens_out": 0}
+
+
+def _assemble(hit: _Retrieval) -> AssembledContext:
+    ctx = assemble_context(
+        passages_from(hit.docs, hit.sources),
+        max_tokens=CONTEXT_MAX_TOKENS,
+        dedup_threshold=CONTEXT_DEDUP_THRESHOLD,
+    )
+    _context_totals["requests"] += 1
+    _context_totals["tokens_in"] += ctx.stats.tokens_in
+    _context_totals["tokens_out"] += ctx.stats.tokens_out
+    return ctx
+
+
+def _build_prompt(query: str, context: str) -> str:
+    return (
+        "You are a helpful assistant. Use the context to answer the question.\n"
+        "Cite relevant sources by filename when possible. If unsure, say you don't know.\n\n"
+        f"Context:\n{context}\n\n"
+        f"Question: {query}\n"
+        "Answer:"
+    )
+
+
+def _cached_answer(hit: _Retrieval) -> Optional[str]:
+    if answer_cache is None:
+        return None
+    found = answer_cache.get(hit.qvec, hit.ids)
+    return found.answer if found is not None else None
+
+
+def _remember_answer(hit: _Retrieval, answer: str) -> None:
+    # Errors and "not configured" placeholders are never cached.
+    if answer_cache is not None and answer and not answer.startswith("[LLM"):
+        answer_cache.put(hit.qvec, hit.ids, answer, hit.sources, epoch=hit.epoch)
+
+
 @app.post("/call/docling.query", response_model=_QueryOut)
 async def call_query(payload: QueryPayload, request: Request) -> _QueryOut:
     started = time.time()
     corr = request.headers.get("x-correlation-id", str(uuid.uuid4()))
     try:
-        qvec = _embed_texts([payload.query])[0]
-        res = collection.query(
-            query_embeddings=cast(List[Sequence[float]], [qvec]), n_results=payload.k
-        )
-
-        docs_any = res.get("documents") or [[]]
-        metas_any = res.get("metadatas") or [[]]
-        docs = cast(List[List[str]], docs_any)
-        metas = cast(List[List[Mapping[str, Union[str, int, float, bool, None]]]], metas_any)
-
-        docs0 = docs[0] if docs else []
-        metas0 = metas[0] if metas else []
-
-        context = "\n\n".join(docs0[: payload.k])
-        prompt = (
-            "You are a helpful assistant. Use the context to answer the question.\n"
-            "Cite relevant sources by filename when possible. If unsure, say you don't know.\n\n"
-            f"Context:\n{context}\n\n"
-            f"Question: {payload.query}\n"
-            "Answer:"
-        )
-        answer = _generate_answer(prompt)
+        hit = await _retrieve(payload.query, payload.k, payload.tenant, payload.where)
+        answer = _cached_answer(hit)
+        cached = answer is not None
+        context: Dict[str, Any] = {}
+        if answer is None:
+            ctx = _assemble(hit)
+            context = ctx.stats.as_dict()
+            answer = await network_pool.run(
+                _generate_answer, _build_prompt(payload.query, ctx.text)
+            )
+            _remember_answer(hit, answer)
 
-        sources: List[Dict[str, Any]] = [dict(m) for m in metas0][: payload.k]
         out = _QueryOut(
             answer=answer,
-            sources=sources,
+            sources=hit.sources,
+            cached=cached,
+            context=context,
             latency_ms=int((time.time() - started) * 1000),
             correlation_id=corr,
         )
-        jlog("docling.query", corr=corr, k=payload.k, latency_ms=out.latency_ms)
+        jlog(
+            "docling.query",
+            corr=corr,
+            k=payload.k,
+            cached=cached,
+            tokens_saved=context.get("tokens_saved"),
+            latency_ms=out.latency_ms,
+        )
         return out
     except Exception as e:
         jlog("error", tool="docling.query", corr=corr, error=str(e))
         raise HTTPException(status_code=400, detail=f"{corr}: {e}") from e
 
 
+def _rerank(query: str, hit: _Retrieval, k: int) -> _Retrieval:
+    """Reorder `hit` by cross-encoder relevance and keep the top `k`."""
+    if not hit.ids:
+        return hit
+    scores = _get_reranker().predict([(query, doc) for doc in hit.docs])
+    order = sorted(range(len(hit.ids)), key=lambda i: float(scores[i]), reverse=True)[:k]
+    return _Retrieval(
+        qvec=hit.qvec,
+        ids=[hit.ids[i] for i in order],
+        docs=[hit.docs[i] for i in order],
+        sources=[hit.sources[i] for i in order],
+        epoch=hit.epoch,
+        scores=[{**hit.scores[i], "rerank": float(scores[i])} for i in order],
+    )
+
+
+@app.post("/call/docling.retrieve")
+async def call_retrieve(payload: RetrievePayload, request: Request) -> Dict[str, Any]:
+    """Retrieval only: ranked chunks with scores, distances and metadata."""
+    started = time.time()
+    corr = request.headers.get("x-correlation-id", str(uuid.uuid4()))
+    try:
+        fetch = max(payload.k, RERANK_CANDIDATES) if payload.rerank else payload.k
+        hit = await _retrieve(payload.query, fetch, payload.tenant, payload.where)
+        if payload.rerank:
+            hit = await inference_pool.run(_rerank, payload.query, hit, payload.k)
+        chunks = [
+            {
+                "id": cid,
+                "rank": rank,
+                "text": doc,
+                "metadata": meta,
+                **(hit.scores[rank] if rank < len(hit.scores) else {}),
+            }
+            for rank, (cid, doc, meta) in enumerate(zip(hit.ids, hit.docs, hit.sources))
+        ]
+        out = {
+            "chunks": chunks,
+            "reranked": payload.rerank,
+            "latency_ms": int((time.time() - started) * 1000),
+            "correlation_id": corr,
+        }
+        jlog(
+            "docling.retrieve",
+            corr=corr,
+            k=payload.k,
+            rerank=payload.rerank,
+            chunks=len(chunks),
+            latency_ms=out["latency_ms"],
+        )
+        return out
+    except Exception as e:
+        jlog("error", tool="docling.retrieve", corr=corr, error=str(e))
+        raise HTTPException(status_code=400, detail=f"{corr}: {e}") from e
+
+
+@app.post("/call/docling.query_many")
+async def call_query_many(payload: QueryManyPayload, request: Request) -> Dict[str, Any]:
+    """Answer many questions: shared embedding + retrieval, bounded concurrent generation."""
+    started = time.time()
+    corr = request.headers.get("x-correlation-id", str(uuid.uuid4()))
+    try:
+        if len(payload.queries) > QUERY_MANY_MAX:
+            raise ValueError(f"At most {QUERY_MANY_MAX} queries per call")
+        tenant = _check_tenant(payload.tenant)
+        if not payload.queries:
+            hits: List[_Retrieval] = []
+            embed_ms = retrieve_ms = 0
+        else:
+            epoch = answer_cache.epoch() if answer_cache is not None else 0
+            qvecs = await _embed_async(list(payload.queries))
+            embed_ms = int((time.time() - started) * 1000)
+            hits = await store_pool.run(
+                _search, payload.queries, qvecs, payload.k, tenant, payload.where, epoch
+            )
+            retrieve_ms = int((time.time() - started) * 1000) - embed_ms
+    except Exception as e:
+        jlog("error", tool="docling.query_many", corr=corr, error=str(e))
+        raise HTTPException(status_code=400, detail=f"{corr}: {e}") from e
+
+    sem = asyncio.Semaphore(max(1, QUERY_MANY_CONCURRENCY))
+
+    async def answer(query: str, hit: _Retrieval) -> Dict[str, Any]:
+        t0 = time.time()
+        item: Dict[str, Any] = {"query": query, "sources": hit.sources, "cached": False}
+        cached = _cached_answer(hit)
+        if cached is not None:
+            item.update(answer=cached, cached=True, context={})
+        else:
+            ctx = _assemble(hit)
+            async with sem:
+                text = await network_pool.run(_generate_answer, _build_prompt(query, ctx.text))
+            _remember_answer(hit, text)
+            item.update(answer=text, context=ctx.stats.as_dict())
+        item["latency_ms"] = int((time.time() - t0) * 1000)
+        return item
+
+    results = await asyncio.gather(*(answer(q, h) for q, h in zip(payload.queries, hits)))
+    out = {
+        "results": results,
+        "embed_ms": embed_ms,
+        "retrieve_ms": retrieve_ms,
+        "latency_ms": int((time.time() - started) * 1000),
+        "correlation_id": corr,
+    }
+    jlog(
+        "docling.query_many",
+        corr=corr,
+        queries=len(results),
+        cached=sum(1 for r in results if r["cached"]),
+        embed_ms=embed_ms,
+        retrieve_ms=retrieve_ms,
+        latency_ms=out["latency_ms"],
+    )
+    return out
+
+
+def _ndjson(event: str, **fields: Any) -> bytes:
+    return (json.dumps({"event": event, **fields}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+@app.post("/call/docling.query_stream")
+async def call_query_stream(payload: QueryPayload, request: Request) -> StreamingResponse:
+    """NDJSON stream: one `sources` event, `token` events as generated, then `done`."""
+    started = time.time()
+    corr = request.headers.get("x-correlation-id", str(uuid.uuid4()))
+    try:
+        hit = await _retrieve(payload.query, payload.k, payload.tenant, payload.where)
+    except Exception as e:
+        jlog("error", tool="docling.query_stream", corr=corr, error=str(e))
+        raise HTTPException(status_code=400, detail=f"{corr}: {e}") from e
+
+    async def events() -> AsyncIterator[bytes]:
+        yield _ndjson("sources", sources=hit.sources, correlation_id=corr)
+        ttft_ms: Optional[int] = None
+        context: Dict[str, Any] = {}
+        cached = _cached_answer(hit)
+        try:
+            if cached is not None:
+                ttft_ms = int((time.time() - started) * 1000)
+                yield _ndjson("token", text=cached)
+            else:
+                pieces: List[str] = []
+                ctx = _assemble(hit)
+                context = ctx.stats.as_dict()
+                prompt = _build_prompt(payload.query, ctx.text)
+                stream = _iterate_in_thread(_generate_stream(prompt), network_pool)
+                async with aclosing(stream):
+                    async for piece in stream:
+                        if await request.is_disconnected():
+                            jlog("docling.query_stream.disconnected", corr=corr)
+                            return
+                        if ttft_ms is None:
+                            ttft_ms = int((time.time() - started) * 1000)
+                        pieces.append(piece)
+                        yield _ndjson("token", text=piece)
+                _remember_answer(hit, "".join(pieces))
+        except Exception as e:
+            jlog("error", tool="docling.query_stream", corr=corr, error=str(e))
+            yield _ndjson("error", error=f"[LLM error] {e}", correlation_id=corr)
+            return
+        latency_ms = int((time.time() - started) * 1000)
+        jlog(
+            "docling.query_stream",
+            corr=corr,
+            k=payload.k,
+            cached=cached is not None,
+            tokens_saved=context.get("tokens_saved"),
+            ttft_ms=ttft_ms,
+            latency_ms=latency_ms,
+        )
+        yield _ndjson(
+            "done",
+            cached=cached is not None,
+            context=context,
+            ttft_ms=ttft_ms,
+            latency_ms=latency_ms,
+            correlation_id=corr,
+        )
+
+    return StreamingResponse(
+        events(), media_type="application/x-ndjson", headers={"x-correlation-id": corr}
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
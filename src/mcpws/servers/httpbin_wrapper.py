@@ -26,9 +26,11 @@ import uuid
 from typing import Any, Dict
 
 import requests  # type: ignore[import-untyped]
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 import uvicorn
 
+from .catalog import catalog_response
+
 UPSTREAM_URL = os.getenv("UPSTREAM_URL", "https://httpbin.org/get")
 TIMEOUT = float(os.getenv("TIMEOUT", "20"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -55,24 +57,27 @@ def health() -> Dict[str, str]:
 
 
 @app.get("/tools")
-def tools() -> Dict[str, Any]:
+def tools(request: Request) -> Response:
     """
     MCP-style tool registry endpoint.
     NOTE: Schema is intentionally empty (no inputs) to match the Day-1 lab.
     """
-    return {
-        "tools": [
-            {
-                "name": "httpbin.get",
-                "description": f"GET {UPSTREAM_URL}",
-                "schema": {
-                    "type": "object",
-                    "properties": {},
-                    "additionalProperties": False,
-                },
-            }
-        ]
-    }
+    return catalog_response(
+        request,
+        {
+            "tools": [
+                {
+                    "name": "httpbin.get",
+                    "description": f"GET {UPSTREAM_URL}",
+                    "schema": {
+                        "type": "object",
+                        "properties": {},
+                        "additionalProperties": False,
+                    },
+                }
+            ]
+        },
+    )
 
 
 @app.post("/call/httpbin.get")
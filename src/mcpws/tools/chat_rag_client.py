@@ -1,7 +1,8 @@
 """
 Gateway RAG Chat Client (Docling)
 ---------------------------------
-Simple client that calls the gateway's docling.query tool.
+Simple client that calls the gateway's docling.query tool, or streams the
+answer token by token from docling.query_stream with --stream.
 
 Env:
   GATEWAY_URL=http://localhost:4444
@@ -9,14 +10,18 @@ Env:
 
 Usage:
   uv run -- python -m src.mcpws.tools.chat_rag_client "What is our refund policy?"
+  uv run -- python -m src.mcpws.tools.chat_rag_client --stream "What is our refund policy?"
 """
 
 from __future__ import annotations
 
+import json
 import os
 import sys
-import requests  # type: ignore[import-untyped]
+import time
+from typing import Any, Dict, Iterator
 
+import requests  # type: ignore[import-untyped]
 
 BASE_URL = os.getenv("GATEWAY_URL", "http://localhost:4444").rstrip("/")
 TOKEN = os.getenv("GATEWAY_TOKEN", "")
@@ -33,8 +38,44 @@ def ask(query: str, k: int = 4) -> dict:
     return r.json()
 
 
+def ask_stream(query: str, k: int = 4) -> Iterator[Dict[str, Any]]:
+    """Yield docling.query_stream events: sources, then tokens, then done."""
+    url = f"{BASE_URL}/call/docling.query_stream"
+    with requests.post(
+        url, json={"query": query, "k": k}, headers=HEADERS, timeout=60, stream=True
+    ) as r:
+        r.raise_for_status()
+        for line in r.iter_lines(decode_unicode=True):
+            if line:
+                yield json.loads(line)
+
+
+def _print_stream(question: str) -> None:
+    t0 = time.time()
+    ttft = None
+    for event in ask_stream(question):
+        kind = event.get("event")
+        if kind == "sources":
+            print("\nSources:", event.get("sources", []))
+            print("\nAnswer:")
+        elif kind == "token":
+            if ttft is None:
+                ttft = int((time.time() - t0) * 1000)
+            print(event.get("text", ""), end="", flush=True)
+        elif kind == "error":
+            print("\n", event.get("error", ""))
+        elif kind == "done":
+            print(f"\n\n(first token after {ttft} ms, total {event.get('latency_ms')} ms)")
+
+
 def main() -> int:
-    question = sys.argv[1] if len(sys.argv) > 1 else "Summarize our SOW termination clause."
+    args = sys.argv[1:]
+    stream = "--stream" in args
+    args = [a for a in args if a != "--stream"]
+    question = args[0] if args else "Summarize our SOW termination clause."
+    if stream:
+        _print_stream(question)
+        return 0
     resp = ask(question)
     print("\nAnswer:\n", resp.get("answer", ""))
     print("\nSources:", resp.get("sources", []))
@@ -2,12 +2,21 @@ from typing import Optional
 from crewai.tools import BaseTool
 from ..utils.gateway_client import GatewayClient
 
+_gateway: Optional[GatewayClient] = None
+
+
+def _get_gateway() -> GatewayClient:
+    # One client (and its pooled session) for every tool instance and call.
+    global _gateway
+    if _gateway is None:
+        _gateway = GatewayClient()
+    return _gateway
+
 
 class GatewaySummarizeTool(BaseTool):
     name: str = "GatewaySummarize"
     description: str = "Summarize text via MCP Context Forge tool lf.summarize"
 
     def _run(self, text: str, run_manager: Optional[object] = None) -> str:  # type: ignore[override]
-        gw = GatewayClient()
-        res = gw.invoke("lf.summarize", {"text": text})
+        res = _get_gateway().invoke("lf.summarize", {"text": text})
         return res.get("summary", "")
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any, AsyncIterator, Dict, List, Optional, Self, Sequence, Tuple, Type
+
+import httpx
+
+from .gateway_client import CONNECT_TIMEOUT, KEEP_ALIVE, POOL_SIZE, RETRIES
+from .logging import get_logger, correlation_id
+from .tool_catalog import ToolCatalogCache, default_catalog_cache
+
+INVOKE_CONCURRENCY = int(os.getenv("GATEWAY_INVOKE_CONCURRENCY", "8"))
+
+
+@dataclass
+class InvokeResult:
+    """Outcome of one call in `invoke_many`; exactly one of `result`/`error` is set."""
+
+    index: int
+    tool: str
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    latency_ms: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AsyncGatewayClient:
+    """asyncio counterpart of `GatewayClient` (httpx, one pooled connection pool).
+
+    Use as `async with AsyncGatewayClient() as gw: ...` or call `aclose()`.
+    Connection failures are retried (`retries`); a call that reached the
+    gateway is never repeated.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: float = 60.0,
+        *,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        pool_size: int = POOL_SIZE,
+        retries: int = RETRIES,
+        keep_alive: bool = KEEP_ALIVE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        tools_cache: Optional[ToolCatalogCache] = None,
+    ) -> None:
+        default_url = os.getenv("GATEWAY_URL", "http://localhost:4444")
+        self.base_url = (base_url or default_url).rstrip("/")
+        self.token = token or os.getenv("GATEWAY_TOKEN", "")
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        # httpx ignores client-level `limits` when a transport is given, so the
+        # pool limits go on the transport itself.
+        limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size if keep_alive else 0,
+        )
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            transport=transport or httpx.AsyncHTTPTransport(retries=retries, limits=limits),
+        )
+        self.tools_cache = tools_cache or default_catalog_cache()
+        self.log = get_logger("gateway-client")
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    def _headers(self) -> Dict[str, str]:
+        h = {"Content-Type": "application/json", "x-correlation-id": correlation_id()}
+        if self.token:
+            h["Authorization"] = f"Bearer {self.token}"
+        return h
+
+    async def list_tools(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Tool catalog via the shared catalog cache (same rules as `GatewayClient`)."""
+        key = self.tools_cache.key(self.base_url, self.token)
+        if not refresh:
+            cached = self.tools_cache.fresh(key)
+            if cached is not None:
+                return cached
+        entry = self.tools_cache.get(key)
+        headers = self._headers()
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        try:
+            r = await self.client.get(f"{self.base_url}/tools", headers=headers)
+            if entry is not None and r.status_code == 304:
+                return self.tools_cache.touch(key)
+            r.raise_for_status()
+        except httpx.HTTPError as e:
+            if entry is None:
+                raise
+            self.log.warning(
+                "tool.list_tools.stale", extra={"extra": {"error": str(e), "age_s": entry.age()}}
+            )
+            return entry.tools
+        data = r.json()
+        tools = data if isinstance(data, list) else []
+        self.tools_cache.put(key, tools, r.headers.get("ETag"))
+        return tools
+
+    async def invoke(
+        self, tool: str, payload: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        t0 = time.time()
+        r = await self.client.post(
+            f"{self.base_url}/call/{tool}",
+            json=payload,
+            headers=self._headers(),
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+        r.raise_for_status()
+        res: Dict[str, Any] = r.json() if r.content else {}
+        self.log.info(
+            "tool.invoke.ok",
+            extra={"extra": {"tool": tool, "latency_ms": int((time.time() - t0) * 1000)}},
+        )
+        return res
+
+    async def invoke_many(
+        self,
+        calls: Sequence[Tuple[str, Dict[str, Any]]],
+        *,
+        concurrency: int = INVOKE_CONCURRENCY,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[InvokeResult]:
+        """Run `(tool, payload)` calls concurrently and yield results as they complete.
+
+        At most `concurrency` calls are in flight; `timeout` bounds each call
+        (time spent waiting for a slot is not counted). Failures are reported
+        in `InvokeResult.error` instead of raising, so one bad call does not
+        cancel the rest; `InvokeResult.index` maps a result back to `calls`.
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+        limit = timeout if timeout is not None else self.timeout
+
+        async def one(index: int, tool: str, payload: Dict[str, Any]) -> InvokeResult:
+            async with sem:
+                t0 = time.time()
+                try:
+                    res = await asyncio.wait_for(self.invoke(tool, payload, limit), limit)
+                    out = InvokeResult(index, tool, result=res)
+                except asyncio.TimeoutError:
+                    out = InvokeResult(index, tool, error=f"timed out after {limit}s")
+                except Exception as e:
+                    out = InvokeResult(index, tool, error=f"{type(e).__name__}: {e}")
+                out.latency_ms = int((time.time() - t0) * 1000)
+                return out
+
+        tasks = [asyncio.ensure_future(one(i, t, p)) for i, (t, p) in enumerate(calls)]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for t in tasks:
+                t.cancel()
@@ -1,12 +1,58 @@
 from __future__ import annotations
 
+import json
 import os
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests  # type: ignore[import-untyped]
+from requests.adapters import HTTPAdapter  # type: ignore[import-untyped]
+from urllib3.util.retry import Retry
 
 from .logging import get_logger, correlation_id
+from .tool_catalog import ToolCatalogCache, default_catalog_cache
+
+# Connection pooling / retry defaults (overridable per client)
+POOL_SIZE = int(os.getenv("GATEWAY_POOL_SIZE", "32"))
+CONNECT_TIMEOUT = float(os.getenv("GATEWAY_CONNECT_TIMEOUT", "5"))
+RETRIES = int(os.getenv("GATEWAY_RETRIES", "3"))
+BACKOFF = float(os.getenv("GATEWAY_BACKOFF", "0.3"))
+KEEP_ALIVE = bool(int(os.getenv("GATEWAY_KEEP_ALIVE", "1")))
+
+_sessions: Dict[Tuple[int, int, float], requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def shared_session(
+    pool_size: int = POOL_SIZE, retries: int = RETRIES, backoff: float = BACKOFF
+) -> requests.Session:
+    """Process-wide pooled session, one per (pool size, retry policy).
+
+    Connection failures are retried for every method (nothing reached the
+    server); read errors and 502/503/504 answers only for idempotent methods,
+    so a tool call (POST) is never executed twice.
+    """
+    key = (pool_size, retries, backoff)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            retry = Retry(
+                total=retries,
+                connect=retries,
+                read=retries,
+                status=retries,
+                backoff_factor=backoff,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+        return session
 
 
 class GatewayClient:
@@ -15,6 +61,14 @@ class GatewayClient:
         base_url: Optional[str] = None,
         token: Optional[str] = None,
         timeout: float = 60.0,
+        *,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        pool_size: int = POOL_SIZE,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF,
+        keep_alive: bool = KEEP_ALIVE,
+        session: Optional[requests.Session] = None,
+        tools_cache: Optional[ToolCatalogCache] = None,
     ) -> None:
         # Ensure we always have a string before calling rstrip()
         # Pull env var out first to help mypy infer the type as 'str'
@@ -22,29 +76,64 @@ class GatewayClient:
         self.base_url = (base_url or default_url).rstrip("/")
         self.token = token or os.getenv("GATEWAY_TOKEN", "")
         self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.keep_alive = keep_alive
+        # Clients with the same pool settings share connections (and keep-alive).
+        self.session = session or shared_session(pool_size, retries, backoff)
+        self.tools_cache = tools_cache or default_catalog_cache()
         self.log = get_logger("gateway-client")
 
+    @property
+    def _timeouts(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.timeout)
+
     def _headers(self) -> Dict[str, str]:
         h = {"Content-Type": "application/json", "x-correlation-id": correlation_id()}
+        if not self.keep_alive:
+            h["Connection"] = "close"
         if self.token:
             h["Authorization"] = f"Bearer {self.token}"
         return h
 
-    def list_tools(self) -> List[Dict[str, Any]]:
-        r = requests.get(f"{self.base_url}/tools", headers=self._headers(), timeout=self.timeout)
-        r.raise_for_status()
+    def list_tools(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Tool catalog, from the catalog cache while fresh (see `ToolCatalogCache`).
+
+        `refresh=True` skips the TTL but still revalidates with the cached ETag.
+        """
+        key = self.tools_cache.key(self.base_url, self.token)
+        if not refresh:
+            cached = self.tools_cache.fresh(key)
+            if cached is not None:
+                return cached
+        entry = self.tools_cache.get(key)
+        headers = self._headers()
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        try:
+            r = self.session.get(f"{self.base_url}/tools", headers=headers, timeout=self._timeouts)
+            if entry is not None and r.status_code == 304:
+                return self.tools_cache.touch(key)
+            r.raise_for_status()
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+            self.log.warning(
+                "tool.list_tools.stale", extra={"extra": {"error": str(e), "age_s": entry.age()}}
+            )
+            return entry.tools
         data = r.json()
-        if isinstance(data, list):
-            return data
-        return []
+        tools = data if isinstance(data, list) else []
+        etag = r.headers.get("ETag")
+        self.tools_cache.put(key, tools, etag if isinstance(etag, str) else None)
+        return tools
 
     def invoke(self, tool: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         t0 = time.time()
-        r = requests.post(
+        r = self.session.post(
             f"{self.base_url}/call/{tool}",
             json=payload,
             headers=self._headers(),
-            timeout=self.timeout,
+            timeout=self._timeouts,
         )
         r.raise_for_status()
         res = r.json() if r.content else {}
@@ -53,3 +142,32 @@ class GatewayClient:
             extra={"extra": {"tool": tool, "latency_ms": int((time.time() - t0) * 1000)}},
         )
         return res
+
+    def invoke_stream(self, tool: str, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Call a streaming tool and yield its NDJSON events as they arrive."""
+        t0 = time.time()
+        first: Optional[int] = None
+        with self.session.post(
+            f"{self.base_url}/call/{tool}",
+            json=payload,
+            headers=self._headers(),
+            timeout=self._timeouts,
+            stream=True,
+        ) as r:
+            r.raise_for_status()
+            for line in r.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                if first is None:
+                    first = int((time.time() - t0) * 1000)
+                yield json.loads(line)
+        self.log.info(
+            "tool.invoke_stream.ok",
+            extra={
+                "extra": {
+                    "tool": tool,
+                    "first_event_ms": first,
+                    "latency_ms": int((time.time() - t0) * 1000),
+                }
+            },
+        )
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+# Catalog cache defaults: seconds a cached /tools answer is used without asking
+# the gateway, and an optional JSON file so the cache survives restarts.
+TOOLS_TTL_S = float(os.getenv("GATEWAY_TOOLS_TTL_S", "300"))
+TOOLS_CACHE_FILE = os.getenv("GATEWAY_TOOLS_CACHE_FILE", "").strip() or None
+
+
+@dataclass
+class CatalogEntry:
+    tools: List[Dict[str, Any]]
+    etag: Optional[str]
+    fetched_at: float
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class ToolCatalogCache:
+    """`/tools` answers per gateway (URL + token), in memory and optionally on disk.
+
+    Entries younger than `ttl_s` are served without a request; older ones are
+    revalidated with If-None-Match, so an unchanged catalog costs a 304.
+    """
+
+    def __init__(self, ttl_s: float = TOOLS_TTL_S, path: Optional[str] = None) -> None:
+        self.ttl_s = ttl_s
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._loaded = path is None
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(base_url: str, token: Optional[str] = "") -> str:
+        # Catalogs can differ per caller; never keep the token itself.
+        who = hashlib.sha256(token.encode("utf-8")).hexdigest()[:12] if token else "anon"
+        return f"{base_url}#{who}"
+
+    def get(self, key: str) -> Optional[CatalogEntry]:
+        with self._lock:
+            self._load()
+            return self._entries.get(key)
+
+    def fresh(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self.get(key)
+        if entry is not None and entry.age() < self.ttl_s:
+            self.hits += 1
+            return entry.tools
+        return None
+
+    def put(self, key: str, tools: List[Dict[str, Any]], etag: Optional[str]) -> None:
+        self.misses += 1
+        self._store(key, CatalogEntry(tools=tools, etag=etag, fetched_at=time.time()))
+
+    def touch(self, key: str) -> List[Dict[str, Any]]:
+        """The gateway answered 304: the cached catalog is current again."""
+        entry = self.get(key)
+        assert entry is not None
+        self.revalidated += 1
+        self._store(key, CatalogEntry(entry.tools, entry.etag, time.time()))
+        return entry.tools
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+        }
+
+    def _store(self, key: str, entry: CatalogEntry) -> None:
+        with self._lock:
+            self._load()
+            self._entries[key] = entry
+            if self.path:
+                self._save()
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path or "", encoding="utf-8") as f:
+                raw = json.load(f)
+            self._entries.update({k: CatalogEntry(**v) for k, v in raw.items()})
+        except (OSError, ValueError, TypeError):
+            pass  # missing or unreadable cache file: start empty
+
+    def _save(self) -> None:
+        path = self.path or ""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({k: asdict(v) for k, v in self._entries.items()}, f)
+        os.replace(tmp, path)
+
+
+_default_cache: Optional[ToolCatalogCache] = None
+
+
+def default_catalog_cache() -> ToolCatalogCache:
+    """Process-wide cache shared by every client that doesn't bring its own."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ToolCatalogCache(TOOLS_TTL_S, TOOLS_CACHE_FILE)
+    return _default_cache
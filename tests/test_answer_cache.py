@@ -0,0 +1,30 @@
+from src.mcpws.rag.answer_cache import AnswerCache
+
+
+def test_similar_query_with_same_chunks_hits():
+    cache = AnswerCache(threshold=0.95)
+    cache.put([1.0, 0.0], ["a.pdf:1", "a.pdf:2"], "30 days", [{"source": "a.pdf"}])
+
+    hit = cache.get([0.99, 0.05], ["a.pdf:2", "a.pdf:1"])
+    assert hit is not None and hit.answer == "30 days"
+    assert cache.get([0.0, 1.0], ["a.pdf:1", "a.pdf:2"]) is None
+    assert cache.get([1.0, 0.0], ["a.pdf:1"]) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_ingest_changes_invalidate_entries():
+    cache = AnswerCache()
+    cache.put([1.0], ["a.pdf:1"], "x", [])
+    cache.put([1.0], ["b.pdf:1"], "y", [])
+
+    assert cache.invalidate(["a.pdf:1"]) == 1
+    assert cache.get([1.0], ["a.pdf:1"]) is None
+    assert cache.invalidate_source("b.pdf") == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_stale_epoch_is_not_stored():
+    cache = AnswerCache()
+    epoch = cache.epoch()
+    cache.invalidate(["a.pdf:1"])
+    assert cache.put([1.0], ["a.pdf:1"], "old", [], epoch=epoch) is False
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import httpx
+
+from src.mcpws.utils.async_gateway_client import AsyncGatewayClient
+
+
+def _client(handler, **kw):
+    return AsyncGatewayClient(base_url="http://fake", transport=httpx.MockTransport(handler), **kw)
+
+
+def test_list_tools_and_invoke():
+    async def handler(request):
+        if request.url.path == "/tools":
+            return httpx.Response(200, json=[{"name": "lf.summarize"}])
+        assert json.loads(request.content) == {"text": "hi"}
+        return httpx.Response(200, json={"summary": "ok"})
+
+    async def main():
+        async with _client(handler) as gw:
+            return await gw.list_tools(), await gw.invoke("lf.summarize", {"text": "hi"})
+
+    tools, res = asyncio.run(main())
+    assert tools[0]["name"] == "lf.summarize"
+    assert res["summary"] == "ok"
+
+
+def test_invoke_many_limits_concurrency_and_yields_as_completed():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        delay = json.loads(request.content)["delay"]
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(delay)
+        in_flight -= 1
+        if request.url.path.endswith("/bad"):
+            return httpx.Response(500)
+        return httpx.Response(200, json={"delay": delay})
+
+    calls = [
+        ("slow", {"delay": 0.05}),
+        ("fast", {"delay": 0.0}),
+        ("bad", {"delay": 0.0}),
+        ("hung", {"delay": 1.0}),
+    ]
+
+    async def main():
+        async with _client(handler) as gw:
+            return [r async for r in gw.invoke_many(calls, concurrency=2, timeout=0.2)]
+
+    results = asyncio.run(main())
+    assert peak <= 2
+    assert len(results) == 4
+    by_tool = {r.tool: r for r in results}
+    assert by_tool["slow"].result == {"delay": 0.05} and by_tool["slow"].index == 0
+    assert not by_tool["bad"].ok and "500" in by_tool["bad"].error
+    assert "timed out" in by_tool["hung"].error
+    assert results.index(by_tool["fast"]) < results.index(by_tool["slow"])
+
+
+def test_pool_limits_apply_to_the_transport():
+    async def main():
+        async with AsyncGatewayClient(base_url="http://fake", pool_size=3, keep_alive=False) as gw:
+            pool = gw.client._transport._pool
+            return pool._max_connections, pool._max_keepalive_connections
+
+    assert asyncio.run(main()) == (3, 0)
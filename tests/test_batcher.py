@@ -0,0 +1,23 @@
+import asyncio
+
+from src.mcpws.rag.batcher import EmbeddingBatcher
+
+
+def test_concurrent_queries_share_one_backend_call():
+    calls = []
+
+    async def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    async def scenario():
+        batcher = EmbeddingBatcher(embed, max_batch=8, max_wait_ms=50)
+        out = await asyncio.gather(*(batcher.embed(t) for t in ["a", "bb", "a", "ccc"]))
+        await batcher.stop()
+        return out, batcher.stats()
+
+    out, stats = asyncio.run(scenario())
+    assert out == [[1.0], [2.0], [1.0], [3.0]]
+    assert calls == [["a", "bb", "ccc"]]
+    assert stats["batches"] == 1
+    assert stats["max_batch_size"] == 4
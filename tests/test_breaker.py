@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from src.mcpws.rag.breaker import CircuitBreaker, CircuitOpenError, RetryBudget
+
+
+def _boom():
+    raise RuntimeError("down")
+
+
+def test_opens_after_consecutive_failures_and_short_circuits():
+    breaker = CircuitBreaker("t", failure_threshold=2, reset_timeout_s=60, retries=0)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            breaker.call(_boom)
+    assert breaker.state == "open"
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+    assert calls == []
+    assert breaker.stats()["rejected"] == 1
+    breaker.shutdown()
+
+
+def test_half_open_allows_one_trial_then_closes():
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_timeout_s=0.01, retries=0)
+    with pytest.raises(RuntimeError):
+        breaker.call(_boom)
+    assert not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.probe_due()
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+    breaker.shutdown()
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker("t", failure_threshold=5, reset_timeout_s=0.01, retries=0)
+    for _ in range(5):
+        with pytest.raises(RuntimeError):
+            breaker.call(_boom)
+    time.sleep(0.02)
+    assert breaker.allow()  # the trial slot
+    assert not breaker.allow()  # only one trial at a time
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.probe_due()
+    breaker.shutdown()
+
+
+def test_timeout_counts_as_failure():
+    breaker = CircuitBreaker("t", failure_threshold=1, timeout_s=0.02, retries=0)
+    with pytest.raises(TimeoutError):
+        breaker.call(time.sleep, 0.2)
+    stats = breaker.stats()
+    assert stats["timeouts"] == 1 and stats["state"] == "open"
+    breaker.shutdown()
+
+
+def test_retries_are_limited_by_the_budget():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("blip")
+        return "ok"
+
+    breaker = CircuitBreaker("t", failure_threshold=3, retries=2, budget=RetryBudget(min_tokens=1))
+    assert breaker.call(flaky) == "ok"
+    assert len(attempts) == 2 and breaker.stats()["retries"] == 1
+
+    empty = CircuitBreaker("t", failure_threshold=3, retries=2, budget=RetryBudget(min_tokens=0))
+    with pytest.raises(RuntimeError):
+        empty.call(_boom)
+    assert empty.stats()["retries"] == 0
+    breaker.shutdown()
+    empty.shutdown()
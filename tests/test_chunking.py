@@ -0,0 +1,48 @@
+from src.mcpws.rag.chunking import MarkdownChunker, char_chunker, count_tokens, make_chunker
+
+DOC = """# Policy
+
+Refunds are issued within 30 days of purchase.
+
+## Pricing
+
+| plan | price |
+|------|-------|
+| pro  | 10    |
+
+```text
+keep me whole
+```
+"""
+
+
+def test_markdown_chunker_keeps_blocks_whole():
+    chunks = list(MarkdownChunker(max_tokens=40, min_tokens=5)(DOC))
+
+    assert chunks[0].startswith("# Policy")
+    assert chunks[1].startswith("## Pricing")
+    assert "| plan | price |\n|------|-------|\n| pro  | 10    |" in chunks[1]
+    assert "```text\nkeep me whole\n```" in chunks[1]
+
+
+def test_markdown_chunker_respects_budget_and_word_boundaries():
+    text = " ".join(f"word{i}" for i in range(100))
+    chunks = list(MarkdownChunker(max_tokens=16, overlap_tokens=0)(text))
+
+    assert all(count_tokens(c) <= 16 for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_markdown_chunker_overlaps_trailing_blocks():
+    text = "\n\n".join(f"para {i} text" for i in range(6))
+    chunks = list(MarkdownChunker(max_tokens=9, overlap_tokens=3)(text))
+
+    assert chunks[0] == "para 0 text\n\npara 1 text\n\npara 2 text"
+    assert chunks[1].startswith("para 2 text")
+
+
+def test_char_chunker_matches_character_windows():
+    assert list(char_chunker(4, 1)("abcdefghij")) == ["abcd", "defg", "ghij", "j"]
+    assert list(make_chunker("chars", size=0, overlap=0, max_tokens=1, overlap_tokens=0)("x")) == [
+        "x"
+    ]
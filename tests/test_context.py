@@ -0,0 +1,56 @@
+from src.mcpws.rag.context import Passage, assemble_context, passages_from
+
+LONG = "The renewal window opens ninety days before the end of the term and closes at thirty."
+
+
+def test_adjacent_and_overlapping_chunks_are_merged():
+    a = "Section 4. " + LONG
+    b = LONG + " Notice must be written."
+    passages = passages_from(
+        [b, a, "Unrelated text."],
+        [
+            {"source": "sow.pdf", "chunk": 5},
+            {"source": "sow.pdf", "chunk": 4},
+            {"source": "msa.pdf", "chunk": 1},
+        ],
+    )
+    ctx = assemble_context(passages)
+
+    assert ctx.stats.merged == 1
+    assert ctx.passages[0].text == "Section 4. " + LONG + " Notice must be written."
+    assert ctx.text.startswith("[sow.pdf]\n")
+    assert ctx.stats.tokens_saved > 0
+
+
+def test_near_duplicates_are_dropped():
+    passages = [
+        Passage(LONG, {"source": "a.pdf"}, 0),
+        Passage(LONG.replace("thirty", "30"), {"source": "a-copy.pdf"}, 1),
+    ]
+    ctx = assemble_context(passages, dedup_threshold=0.8)
+
+    assert ctx.stats.duplicates == 1
+    assert [p.source for p in ctx.passages] == ["a.pdf"]
+
+
+def test_passages_are_packed_into_the_budget():
+    big = " ".join(["clause"] * 50)
+    passages = [
+        Passage(big, {"source": "a.pdf"}, 0),
+        Passage(big + " more", {"source": "b.pdf"}, 1),
+        Passage("short one", {"source": "c.pdf"}, 2),
+    ]
+    ctx = assemble_context(passages, max_tokens=70)
+
+    assert [p.source for p in ctx.passages] == ["a.pdf", "c.pdf"]
+    assert ctx.stats.over_budget == 1
+    assert ctx.stats.tokens_out <= 70
+
+    truncated = assemble_context(passages[:1], max_tokens=10)
+    assert truncated.stats.tokens_out <= 10
+
+
+def test_single_passage_reports_no_savings():
+    ctx = assemble_context([Passage(LONG, {"source": "a.pdf"}, 0)])
+    assert ctx.stats.tokens_saved == 0
+    assert ctx.stats.tokens_in == ctx.stats.tokens_out
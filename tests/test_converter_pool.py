@@ -0,0 +1,52 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from src.mcpws.rag import convert
+from src.mcpws.rag.convert import ConverterPool
+
+
+def test_pool_reuses_warm_instances():
+    made = []
+    pool = ConverterPool(size=2, factory=lambda: made.append(object()) or made[-1])
+    pool.warm()
+    assert len(made) == 2
+
+    seen = set()
+    for _ in range(5):
+        with pool.checkout() as (conv, waited):
+            seen.add(id(conv))
+            assert waited >= 0
+    assert seen <= {id(m) for m in made}
+    assert pool.stats()["checkouts"] == 5
+    assert pool.stats()["idle"] == 2
+
+
+def test_checkout_waits_for_a_returned_instance():
+    pool = ConverterPool(size=1, factory=object)
+    held, release = threading.Event(), threading.Event()
+
+    def hold():
+        with pool.checkout():
+            held.set()
+            release.wait()
+
+    t = threading.Thread(target=hold)
+    t.start()
+    held.wait()
+    threading.Timer(0.05, release.set).start()
+    with pool.checkout() as (_, waited):
+        assert waited >= 40
+    t.join()
+    assert pool.created == 1
+
+
+def test_pool_wait_includes_the_time_queued_for_a_worker(monkeypatch):
+    class FakeConverter:
+        def convert(self, path):
+            return SimpleNamespace(document=SimpleNamespace(export_to_markdown=lambda: path))
+
+    monkeypatch.setattr(convert, "_pool", ConverterPool(size=1, factory=FakeConverter))
+    out = convert.convert_document("a.pdf", "a-text", submitted=time.time() - 0.05)
+    assert out.text == "a-text"
+    assert out.pool_wait_ms >= 50
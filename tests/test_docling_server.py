@@ -0,0 +1,204 @@
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from src.mcpws.servers import docling_mcp_server as srv
+
+
+def test_import_is_lazy_and_not_ready_until_warm():
+    c = TestClient(srv.app)
+    assert c.get("/health").json()["status"] == "ok"
+    r = c.get("/ready")
+    assert r.status_code == 503
+    assert r.json()["components"]["vector_store"] is False
+    assert srv._collection is None
+    assert srv._local_embedder is None
+
+
+def test_unknown_job_is_404():
+    c = TestClient(srv.app)
+    assert c.get("/jobs/nope").status_code == 404
+    assert c.post("/call/docling.job", json={"job_id": "nope"}).status_code == 404
+
+
+def test_query_stream_emits_sources_then_tokens_and_caches(monkeypatch):
+    async def retrieve(query, k, tenant=None, where=None):
+        return srv._Retrieval([1.0, 0.0], ["a.pdf:1"], ["ctx"], [{"source": "a.pdf", "chunk": 0}])
+
+    monkeypatch.setattr(srv, "_retrieve", retrieve)
+    monkeypatch.setattr(srv, "_generate_stream", lambda prompt: iter(["Hel", "lo"]))
+    monkeypatch.setattr(srv, "answer_cache", srv.AnswerCache())
+    c = TestClient(srv.app)
+    r = c.post("/call/docling.query_stream", json={"query": "hi"})
+    events = [json.loads(line) for line in r.text.splitlines()]
+
+    assert [e["event"] for e in events] == ["sources", "token", "token", "done"]
+    assert events[0]["sources"] == [{"source": "a.pdf", "chunk": 0}]
+    assert "".join(e["text"] for e in events[1:3]) == "Hello"
+    assert events[-1]["ttft_ms"] is not None
+
+    again = c.post("/call/docling.query", json={"query": "hi"}).json()
+    assert again["cached"] is True
+    assert again["answer"] == "Hello"
+
+
+def test_where_filters_and_tenant_validation():
+    assert srv._chroma_where({}) is None
+    assert srv._chroma_where({"source": "a.pdf"}) == {"source": "a.pdf"}
+    assert srv._chroma_where({"source": "a.pdf", "doc_type": ["msa", "sow"]}) == {
+        "$and": [{"source": "a.pdf"}, {"doc_type": {"$in": ["msa", "sow"]}}]
+    }
+    c = TestClient(srv.app)
+    r = c.post("/call/docling.query", json={"query": "q", "tenant": "../etc"})
+    assert r.status_code == 400
+    assert "Invalid tenant" in r.json()["detail"]
+
+
+def test_query_many_embeds_and_searches_once(monkeypatch):
+    calls = {"embed": [], "search": 0}
+
+    async def embed(texts):
+        calls["embed"].append(list(texts))
+        return [[float(i), 1.0] for i in range(len(texts))]
+
+    def search(queries, qvecs, k, tenant, where, epoch=0):
+        calls["search"] += 1
+        return [
+            srv._Retrieval(v, [f"a.pdf:{i}"], [f"ctx {i}"], [{"source": "a.pdf"}])
+            for i, v in enumerate(qvecs)
+        ]
+
+    monkeypatch.setattr(srv, "_embed_async", embed)
+    monkeypatch.setattr(srv, "_search", search)
+    monkeypatch.setattr(srv, "_generate_answer", lambda prompt: prompt.split("Question: ")[1][:2])
+    monkeypatch.setattr(srv, "answer_cache", None)
+    c = TestClient(srv.app)
+    r = c.post("/call/docling.query_many", json={"queries": ["q1", "q2", "q3"]}).json()
+
+    assert calls == {"embed": [["q1", "q2", "q3"]], "search": 1}
+    assert [item["answer"] for item in r["results"]] == ["q1", "q2", "q3"]
+    assert all("latency_ms" in item for item in r["results"])
+
+
+def test_retrieve_returns_scored_chunks_and_reranks(monkeypatch):
+    async def retrieve(query, k, tenant=None, where=None):
+        ids = [f"a.pdf:{i}" for i in range(3)]
+        return srv._Retrieval(
+            [1.0],
+            ids,
+            ["alpha", "beta", "gamma"],
+            [{"source": "a.pdf", "chunk": i} for i in range(3)],
+            scores=[{"score": 0.5 - i / 10, "distance": 0.1 * i, "bm25": None} for i in range(3)],
+        )
+
+    class Reranker:
+        def predict(self, pairs):
+            return [len(doc) for _, doc in pairs]
+
+    monkeypatch.setattr(srv, "_retrieve", retrieve)
+    monkeypatch.setattr(srv, "_get_reranker", lambda: Reranker())
+    monkeypatch.setattr(srv, "_generate_answer", lambda prompt: 1 / 0)
+    c = TestClient(srv.app)
+
+    plain = c.post("/call/docling.retrieve", json={"query": "q", "k": 3}).json()
+    assert [ch["id"] for ch in plain["chunks"]] == ["a.pdf:0", "a.pdf:1", "a.pdf:2"]
+    assert plain["chunks"][1]["distance"] == 0.1
+
+    ranked = c.post("/call/docling.retrieve", json={"query": "q", "k": 2, "rerank": True}).json()
+    assert [ch["text"] for ch in ranked["chunks"]] == ["alpha", "gamma"]
+    assert ranked["chunks"][0]["rerank"] == 5.0
+
+
+def test_open_wx_breaker_routes_to_local_embedder(monkeypatch):
+    calls = []
+
+    class Embeddings:
+        def create(self, **kw):
+            calls.append(kw["input"])
+            raise RuntimeError("watsonx down")
+
+    class Wx:
+        embeddings = Embeddings()
+
+    breaker = srv.CircuitBreaker("wx-embed", failure_threshold=1, reset_timeout_s=60, retries=0)
+    monkeypatch.setattr(srv, "wx_embed_breaker", breaker)
+    monkeypatch.setattr(srv, "_get_wx_client", lambda: Wx())
+    monkeypatch.setattr(
+        srv, "_wx_embed", lambda client, texts: client.embeddings.create(input=texts)
+    )
+    monkeypatch.setattr(srv, "_get_local_embedder", lambda: lambda texts: [[1.0] for _ in texts])
+
+    assert srv._embed_backend(["a"])[0].startswith("local:")
+    assert srv._embed_backend(["b"])[0].startswith("local:")
+    assert calls == [["a"]]  # the second call skipped watsonx entirely
+    assert srv._embed_pool() is srv.inference_pool
+
+    stats = TestClient(srv.app).get("/metrics").json()["watsonx"]["wx-embed"]
+    assert stats["state"] == "open" and stats["rejected"] == 1
+    breaker.shutdown()
+
+
+def test_closing_the_stream_stops_the_producer_thread():
+    import asyncio
+    import threading
+    import time
+
+    from src.mcpws.rag.executors import MeteredExecutor
+
+    pulled = []
+    closed = threading.Event()
+
+    def endless():
+        try:
+            while True:
+                pulled.append(1)
+                time.sleep(0.01)
+                yield "tok"
+        finally:
+            closed.set()
+
+    async def main():
+        pool = MeteredExecutor("test", 1)
+        stream = srv._iterate_in_thread(endless(), pool)
+        assert await stream.__anext__() == "tok"
+        await stream.aclose()
+        assert await asyncio.to_thread(closed.wait, 2)
+        pool.shutdown()
+
+    asyncio.run(main())
+    assert closed.is_set()
+    assert len(pulled) < 50
+
+
+def test_parse_reads_the_streamed_form(monkeypatch, tmp_path):
+    seen = {}
+
+    async def convert_cached(spooled, return_images=False):
+        with open(spooled.path, "rb") as fh:
+            seen["bytes"] = fh.read()
+        seen["path"] = spooled.path
+        return srv.Converted(spooled.filename, "# text"), False
+
+    monkeypatch.setattr(srv, "HAVE_DOCLING", True)
+    monkeypatch.setattr(srv, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(srv, "_convert_cached", convert_cached)
+    c = TestClient(srv.app)
+    r = c.post(
+        "/call/docling.parse",
+        files={"file": ("docs/a.pdf", b"%PDF-1.7")},
+        data={"return_images": "true"},
+    )
+
+    assert r.status_code == 200
+    assert r.json()["filename"] == "a.pdf"
+    assert r.json()["text"] == "# text"
+    assert r.headers["etag"].endswith('-1"')
+    assert seen["bytes"] == b"%PDF-1.7"
+    assert not os.path.exists(seen["path"])
+
+    monkeypatch.setattr(srv, "MAX_FILE_MB", 0)
+    r = c.post("/call/docling.parse", files={"file": ("a.pdf", b"%PDF-1.7")})
+    assert r.status_code == 400
+    assert "exceeds" in r.json()["detail"]
+    assert not os.listdir(tmp_path)
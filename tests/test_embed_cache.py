@@ -0,0 +1,24 @@
+from src.mcpws.rag.embed_cache import EmbeddingCache
+
+
+def test_cache_hits_misses_and_model_isolation():
+    cache = EmbeddingCache()
+    cache.put_many("local:m", ["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+    assert cache.get_many("local:m", ["a", "c"]) == [[1.0, 2.0], None]
+    assert cache.get_many("wx:m", ["a"]) == [None]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "embed_cache.sqlite")
+    cache = EmbeddingCache(path, max_entries=2)
+    cache.put_many("m", ["a"], [[1.0]])
+    cache.put_many("m", ["b"], [[2.0]])
+    cache.get_many("m", ["a"])  # refresh "a"
+    cache.put_many("m", ["c"], [[3.0]])
+
+    reopened = EmbeddingCache(path, max_entries=2)
+    assert reopened.get_many("m", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from src.mcpws.rag.executors import MeteredExecutor
+
+
+def test_pool_is_bounded_and_reports_queue_time():
+    pool = MeteredExecutor("test", max_workers=1)
+    seen = []
+
+    async def main():
+        async def probe():
+            await asyncio.sleep(0.01)
+            seen.append(pool.stats()["queued"])
+
+        results = await asyncio.gather(
+            pool.run(time.sleep, 0.05), pool.run(lambda x: x * 2, 21), probe()
+        )
+        return results[1]
+
+    assert asyncio.run(main()) == 42
+    stats = pool.stats()
+    assert seen == [1]
+    assert stats["completed"] == 2
+    assert stats["queued"] == 0 and stats["running"] == 0
+    assert stats["max_wait_ms"] >= 30
+    pool.shutdown()
+
+
+def test_failures_are_counted_and_raised():
+    pool = MeteredExecutor("test", max_workers=2)
+
+    async def main():
+        try:
+            await pool.run(lambda: 1 / 0)
+        except ZeroDivisionError:
+            return True
+
+    assert asyncio.run(main()) is True
+    assert pool.stats()["failed"] == 1
+    pool.shutdown()
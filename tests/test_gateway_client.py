@@ -1,10 +1,11 @@
 from unittest.mock import patch, MagicMock
-from src.mcpws.utils.gateway_client import GatewayClient
+from src.mcpws.utils.gateway_client import GatewayClient, shared_session
+from src.mcpws.utils.tool_catalog import ToolCatalogCache
 
 
 def test_list_tools_mocked():
     gc = GatewayClient(base_url="http://fake")
-    with patch("requests.get") as mock_get:
+    with patch.object(gc.session, "get") as mock_get:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.json.return_value = [{"name": "lf.summarize"}]
@@ -15,10 +16,59 @@ def test_list_tools_mocked():
 
 def test_invoke_mocked():
     gc = GatewayClient(base_url="http://fake")
-    with patch("requests.post") as mock_post:
+    with patch.object(gc.session, "post") as mock_post:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.json.return_value = {"summary": "ok", "tokens": 10}
         mock_post.return_value = mock_resp
         res = gc.invoke("lf.summarize", {"text": "hi"})
         assert res["summary"] == "ok"
+
+
+def test_invoke_stream_mocked():
+    gc = GatewayClient(base_url="http://fake")
+    with patch.object(gc.session, "post") as mock_post:
+        mock_resp = MagicMock()
+        mock_resp.iter_lines.return_value = [
+            '{"event": "token", "text": "hi"}',
+            "",
+            '{"event": "done"}',
+        ]
+        mock_post.return_value.__enter__.return_value = mock_resp
+        events = list(gc.invoke_stream("docling.query_stream", {"query": "q"}))
+        assert [e["event"] for e in events] == ["token", "done"]
+        assert mock_post.call_args.kwargs["stream"] is True
+
+
+def test_clients_share_a_pooled_session():
+    a = GatewayClient(
+        base_url="http://fake", pool_size=8, retries=2, tools_cache=ToolCatalogCache()
+    )
+    b = GatewayClient(base_url="http://other", pool_size=8, retries=2)
+    assert a.session is b.session is shared_session(8, 2)
+    adapter = a.session.get_adapter("http://fake")
+    assert adapter._pool_maxsize == 8
+    # Only idempotent methods are retried after the request was sent.
+    assert adapter.max_retries.total == 2
+    assert "POST" not in adapter.max_retries.allowed_methods
+    with patch.object(a.session, "get") as mock_get:
+        mock_get.return_value.json.return_value = []
+        a.list_tools()
+        assert mock_get.call_args.kwargs["timeout"] == (a.connect_timeout, a.timeout)
+
+
+def test_list_tools_uses_cache_then_revalidates_with_etag():
+    cache = ToolCatalogCache(ttl_s=60)
+    gc = GatewayClient(base_url="http://fake", tools_cache=cache)
+    with patch.object(gc.session, "get") as mock_get:
+        ok = MagicMock(status_code=200, headers={"ETag": '"v1"'})
+        ok.json.return_value = [{"name": "calc.add"}]
+        mock_get.return_value = ok
+        assert gc.list_tools()[0]["name"] == "calc.add"
+        assert gc.list_tools()[0]["name"] == "calc.add"
+        assert mock_get.call_count == 1  # second call served from cache
+
+        mock_get.return_value = MagicMock(status_code=304)
+        assert gc.list_tools(refresh=True)[0]["name"] == "calc.add"
+        assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert cache.stats() == {"entries": 1, "hits": 1, "revalidated": 1, "misses": 1}
@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import itertools
+from pathlib import Path
+
+import pytest
+
+from src.mcpws.rag.manifest import DocumentManifest, chunk_id
+from src.mcpws.rag.pipeline import IngestPipeline, IngestSource, PipelineLimits
+from src.mcpws.rag.uploads import SpooledUpload
+
+
+@pytest.fixture
+def source(tmp_path):
+    counter = itertools.count()
+
+    def make(name: str, body: bytes, namespace: str = "") -> IngestSource:
+        path = tmp_path / str(next(counter))
+        path.write_bytes(body)
+        spooled = SpooledUpload(name, str(path), len(body), hashlib.sha256(body).hexdigest())
+
+        async def read() -> SpooledUpload:
+            return spooled
+
+        return IngestSource(filename=name, read=read, meta={"team": "legal"}, namespace=namespace)
+
+    return make
+
+
+def _pipeline(store, manifest=None, batch=64):
+    async def convert(spooled):
+        return await asyncio.to_thread(Path(spooled.path).read_text)
+
+    async def embed(texts):
+        store["embedded"] += len(texts)
+        return [[float(len(t))] for t in texts]
+
+    async def upsert(texts, vecs, ids, metas, namespace):
+        store["upserts"].append((ids, metas))
+        store["namespaces"].append(namespace)
+        store["ids"].update(ids)
+
+    async def delete(ids, namespace):
+        store["ids"].difference_update(ids)
+
+    async def purge(source, namespace):
+        store["ids"] = {i for i in store["ids"] if not i.startswith(f"{source}:")}
+
+    return IngestPipeline(
+        convert=convert,
+        chunk=lambda text: text.split(),
+        embed=embed,
+        upsert=upsert,
+        delete=delete,
+        purge=purge,
+        manifest=manifest,
+        limits=PipelineLimits(embed_batch=batch),
+    )
+
+
+def _store():
+    return {"embedded": 0, "upserts": [], "ids": set(), "namespaces": []}
+
+
+def test_pipeline_batches_and_upserts(source):
+    store = _store()
+    pipe = _pipeline(store, batch=2)
+    stats = asyncio.run(pipe.run([source("a.pdf", b"one two three"), source("b.pdf", b"four")]))
+
+    assert stats.files_converted == 2
+    assert stats.files_ingested == 2
+    assert stats.chunks_embedded == 4
+    assert stats.chunks_upserted == 4
+    assert max(len(ids) for ids, _ in store["upserts"]) == 2
+    assert store["ids"] == {
+        chunk_id("a.pdf", "one"),
+        chunk_id("a.pdf", "two"),
+        chunk_id("a.pdf", "three"),
+        chunk_id("b.pdf", "four"),
+    }
+    ids, metas = next(u for u in store["upserts"] if chunk_id("b.pdf", "four") in u[0])
+    assert metas[ids.index(chunk_id("b.pdf", "four"))] == {
+        "source": "b.pdf",
+        "chunk": 0,
+        "team": "legal",
+    }
+
+
+def test_pipeline_reingest_is_incremental(source):
+    store = _store()
+    pipe = _pipeline(store, manifest=DocumentManifest())
+
+    asyncio.run(pipe.run([source("a.pdf", b"one two three")]))
+    again = asyncio.run(pipe.run([source("a.pdf", b"one two three")]))
+    assert again.files_skipped == 1
+    assert again.files_ingested == 0
+    assert store["embedded"] == 3
+
+    edited = asyncio.run(pipe.run([source("a.pdf", b"one TWO")]))
+    assert edited.chunks_skipped == 1
+    assert edited.chunks_embedded == 1
+    assert edited.chunks_deleted == 2
+    assert store["ids"] == {chunk_id("a.pdf", "one"), chunk_id("a.pdf", "TWO")}
+
+
+def test_pipeline_reupserts_chunks_that_moved(source):
+    store = _store()
+    pipe = _pipeline(store, manifest=DocumentManifest())
+    asyncio.run(pipe.run([source("a.pdf", b"one two")]))
+
+    store["upserts"].clear()
+    asyncio.run(pipe.run([source("a.pdf", b"zero one two")]))
+    chunks = {i: m["chunk"] for ids, metas in store["upserts"] for i, m in zip(ids, metas)}
+    assert chunks == {
+        chunk_id("a.pdf", "zero"): 0,
+        chunk_id("a.pdf", "one"): 1,
+        chunk_id("a.pdf", "two"): 2,
+    }
+
+
+def test_pipeline_keeps_progress_when_a_batch_fails(source):
+    store = _store()
+    manifest = DocumentManifest()
+    pipe = _pipeline(store, manifest=manifest, batch=1)
+    pipe.limits.retries = 2
+    pipe.limits.retry_backoff = 0
+    attempts = []
+    upsert = pipe._upsert
+
+    async def flaky_upsert(texts, vecs, ids, metas, namespace):
+        attempts.append(texts[0])
+        if texts[0] == "bad":
+            raise RuntimeError("chroma down")
+        await upsert(texts, vecs, ids, metas, namespace)
+
+    pipe._upsert = flaky_upsert
+    stats = asyncio.run(pipe.run([source("a.pdf", b"good bad"), source("b.pdf", b"fine")]))
+
+    assert attempts.count("bad") == 2
+    assert stats.chunks_upserted == 2
+    assert stats.chunks_failed == 1
+    assert stats.files_failed == 1
+    assert stats.files_ingested == 1
+    assert stats.errors == ["a.pdf: chroma down"]
+    assert manifest.file_fingerprint("a.pdf") is None
+    assert manifest.file_fingerprint("b.pdf") is not None
+
+
+def test_pipeline_cleans_up_chunks_stored_by_a_failed_ingest(source):
+    store = _store()
+    manifest = DocumentManifest()
+    pipe = _pipeline(store, manifest=manifest, batch=1)
+    pipe.limits.retries = 1
+    asyncio.run(pipe.run([source("a.pdf", b"one two")]))
+    upsert = pipe._upsert
+
+    async def failing_upsert(texts, vecs, ids, metas, namespace):
+        if texts[0] == "bad":
+            raise RuntimeError("chroma down")
+        await upsert(texts, vecs, ids, metas, namespace)
+
+    pipe._upsert = failing_upsert
+    failed = asyncio.run(pipe.run([source("a.pdf", b"one good bad")]))
+    assert failed.files_failed == 1
+    assert chunk_id("a.pdf", "good") in manifest.chunks("a.pdf")
+
+    pipe._upsert = upsert
+    asyncio.run(pipe.run([source("a.pdf", b"one")]))
+    assert store["ids"] == {chunk_id("a.pdf", "one")}
+
+
+def test_pipeline_keeps_namespaces_apart(source):
+    store = _store()
+    manifest = DocumentManifest()
+    pipe = _pipeline(store, manifest=manifest)
+    asyncio.run(pipe.run([source("a.pdf", b"same", "acme"), source("a.pdf", b"same", "globex")]))
+
+    assert store["ids"] == {chunk_id("acme/a.pdf", "same"), chunk_id("globex/a.pdf", "same")}
+    assert sorted(store["namespaces"]) == ["acme", "globex"]
+    assert manifest.file_fingerprint("acme/a.pdf") is not None
+    assert manifest.file_fingerprint("a.pdf") is None
+
+
+def test_default_namespace_names_cannot_reach_into_a_tenant(source):
+    store = _store()
+    manifest = DocumentManifest()
+    pipe = _pipeline(store, manifest=manifest)
+    asyncio.run(pipe.run([source("a.md", b"tenant text", "acme")]))
+    acme = manifest.chunks("acme/a.md")
+
+    stats = asyncio.run(pipe.run([source("acme/a.md", b"other text")]))
+    assert stats.files_failed == 1
+    assert stats.chunks_deleted == 0
+    assert manifest.chunks("acme/a.md") == acme
+    assert store["ids"] == set(acme)
+
+
+def test_pipeline_runs_chunking_and_manifest_io_on_the_given_runners(source):
+    store = _store()
+    pipe = _pipeline(store, manifest=DocumentManifest())
+    ran = []
+
+    def runner(kind):
+        async def run(fn, *args):
+            ran.append((kind, getattr(fn, "__name__", "")))
+            return await asyncio.to_thread(fn, *args)
+
+        return run
+
+    pipe._cpu, pipe._store = runner("cpu"), runner("store")
+    asyncio.run(pipe.run([source("a.pdf", b"one two")]))
+
+    assert ("cpu", "_chunk_file") in ran
+    assert {name for kind, name in ran if kind == "store"} == {
+        "file_fingerprint",
+        "chunks",
+        "commit",
+    }
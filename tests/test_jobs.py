@@ -0,0 +1,28 @@
+import asyncio
+
+from src.mcpws.rag.jobs import JobQueue
+
+
+def test_job_queue_runs_and_reports_progress():
+    async def scenario():
+        q = JobQueue(workers=1)
+
+        async def ok(job):
+            job.stats.files_converted = 2
+            return {"chunks": 3}
+
+        async def boom(job):
+            raise ValueError("bad pdf")
+
+        done, failed = q.submit(ok), q.submit(boom)
+        while q.pending() or failed.finished_at is None:
+            await asyncio.sleep(0)
+        await q.stop()
+        return q.get(done.id).as_dict(), q.get(failed.id).as_dict()
+
+    done, failed = asyncio.run(scenario())
+    assert done["status"] == "done"
+    assert done["result"] == {"chunks": 3}
+    assert done["progress"]["files_converted"] == 2
+    assert failed["status"] == "failed"
+    assert failed["error"] == "bad pdf"
@@ -1,5 +1,12 @@
+import asyncio
+
+import httpx
 from fastapi.testclient import TestClient
+
+from src.mcpws.adapters import langflow_adapter as lf
+from src.mcpws.adapters.coalesce import SingleFlight, TTLCache
 from src.mcpws.adapters.langflow_adapter import app
+from src.mcpws.adapters.upstream import Upstream, UpstreamBusy
 
 
 def test_health():
@@ -14,3 +21,79 @@ def test_tools():
     r = c.get("/tools")
     assert r.status_code == 200
     assert "tools" in r.json()
+
+
+def test_summarize_uses_shared_upstream_and_reports_metrics(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, json={"output": "short", "usage": {"total_tokens": 7}})
+
+    up = Upstream("http://langflow", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(lf, "_upstreams", {lf.LANGFLOW_URL: up})
+    with TestClient(app) as c:
+        r = c.post("/call/lf.summarize", json={"text": "long text"})
+        assert r.json() == {"summary": "short", "tokens": 7}
+        stats = c.get("/metrics").json()["upstreams"][lf.LANGFLOW_URL]
+    assert stats["completed"] == 1 and stats["in_flight"] == 0
+
+
+def test_upstream_limits_concurrency_and_rejects_when_queue_times_out():
+    peak = 0
+
+    async def handler(request):
+        nonlocal peak
+        peak = max(peak, up.in_flight)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"ok": True})
+
+    up = Upstream(
+        "http://langflow",
+        concurrency=2,
+        queue_timeout_s=0.08,
+        transport=httpx.MockTransport(handler),
+    )
+
+    async def main():
+        results = await asyncio.gather(
+            *(up.post_json({"i": i}) for i in range(5)), return_exceptions=True
+        )
+        await up.aclose()
+        return results
+
+    results = asyncio.run(main())
+    assert peak == 2
+    busy = [r for r in results if isinstance(r, UpstreamBusy)]
+    assert len(busy) == 1 and results.count({"ok": True}) == 4
+    stats = up.stats()
+    assert stats["rejected"] == 1 and stats["max_queue_ms"] >= 40
+
+
+def test_identical_summaries_share_one_upstream_call_and_are_cached(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.content)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"summary": "s"})
+
+    monkeypatch.setattr(
+        lf,
+        "_upstreams",
+        {lf.LANGFLOW_URL: Upstream("http://lf", transport=httpx.MockTransport(handler))},
+    )
+    monkeypatch.setattr(lf, "_flights", SingleFlight())
+    monkeypatch.setattr(lf, "summary_cache", TTLCache(ttl_s=60))
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://adapter") as c:
+            same = [c.post("/call/lf.summarize", json={"text": "a"}) for _ in range(3)]
+            other = c.post("/call/lf.summarize", json={"text": "b"})
+            first = await asyncio.gather(*same, other)
+            again = await c.post("/call/lf.summarize", json={"text": "a"})
+            return first + [again], (await c.get("/metrics")).json()
+
+    responses, metrics = asyncio.run(main())
+    assert all(r.json()["summary"] == "s" for r in responses)
+    assert len(calls) == 2  # one per distinct text
+    assert metrics["single_flight"]["coalesced"] == 2
+    assert metrics["summary_cache"]["hits"] == 1
@@ -0,0 +1,72 @@
+from src.mcpws.rag.lexical import LexicalIndex, rrf, terms
+
+
+def test_terms_keep_identifiers_and_their_parts():
+    assert terms("See Clause 4.2.1 of SOW-2291") == [
+        "see",
+        "clause",
+        "4.2.1",
+        "4",
+        "2",
+        "1",
+        "sow-2291",
+        "sow",
+        "2291",
+    ]
+
+
+def test_bm25_ranks_exact_identifier_first_and_persists(tmp_path):
+    path = str(tmp_path / "lexical.sqlite")
+    index = LexicalIndex(path)
+    index.add(
+        ["a.pdf:1", "a.pdf:2", "b.pdf:1"],
+        [
+            "Termination is governed by clause 4.2.1 of the agreement.",
+            "Fees are payable within thirty days of the invoice.",
+            "Clause 7 covers termination for convenience.",
+        ],
+        [{"source": "a.pdf"}, {"source": "a.pdf"}, {"source": "b.pdf"}],
+    )
+
+    reopened = LexicalIndex(path)
+    assert len(reopened) == 3
+    assert reopened.search("clause 4.2.1", k=2)[0][0] == "a.pdf:1"
+
+
+def test_updates_deletes_and_source_purge():
+    index = LexicalIndex()
+    index.add(["a:1", "b:1"], ["alpha beta", "beta gamma"], [{"source": "a"}, {"source": "b"}])
+    index.add(["a:1"], ["delta"], [{"source": "a"}])
+
+    assert index.search("alpha") == []
+    assert [cid for cid, _ in index.search("delta")] == ["a:1"]
+    index.delete_source("a")
+    index.delete(["b:1"])
+    assert len(index) == 0
+    assert index.stats()["docs"] == 0
+
+
+def test_rrf_rewards_agreement():
+    fused = [cid for cid, _ in rrf([["x", "y", "z"], ["y", "w"]])]
+    assert fused[0] == "y"
+
+
+def test_search_is_limited_to_the_namespace():
+    index = LexicalIndex()
+    index.add(["acme/a:1"], ["renewal terms"], [{"source": "a"}], namespace="acme")
+    index.add(["a:1"], ["renewal terms"], [{"source": "a"}])
+
+    assert [cid for cid, _ in index.search("renewal", namespace="acme")] == ["acme/a:1"]
+    assert [cid for cid, _ in index.search("renewal")] == ["a:1"]
+    index.delete_source("a", namespace="acme")
+    assert index.search("renewal", namespace="acme") == []
+
+
+def test_delete_leaves_other_namespaces_alone():
+    index = LexicalIndex()
+    index.add(["x:1"], ["renewal terms"], [{"source": "x"}], namespace="acme")
+
+    index.delete(["x:1"])
+    assert [cid for cid, _ in index.search("renewal", namespace="acme")] == ["x:1"]
+    index.delete(["x:1"], namespace="acme")
+    assert len(index) == 0
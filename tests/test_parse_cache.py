@@ -0,0 +1,50 @@
+import os
+
+from src.mcpws.rag.convert import Converted
+from src.mcpws.rag.parse_cache import ParseCache
+
+
+def test_text_and_image_lookups(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=1 << 20, options="docling=1")
+    cache.put("abc", Converted("a.pdf", "# Title", images=[b"png"]), images=False)
+
+    assert cache.get("abc").text == "# Title"
+    assert cache.get("abc", images=True) is None
+
+    cache.put("abc", Converted("a.pdf", "# Title", images=[b"png"]), images=True)
+    assert cache.get("abc", images=True).images == [b"png"]
+    assert ParseCache(str(tmp_path), 1 << 20, options="docling=2").get("abc") is None
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=400, options="")
+    cache.put("a", Converted("a", "x" * 100))
+    cache.put("b", Converted("b", "y" * 100))
+    os.utime(cache._path(cache.key("b")), (0, 0))  # "b" is now the oldest
+    cache.get("a")
+    cache.put("c", Converted("c", "z" * 100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_image_setting_is_part_of_the_key(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=1 << 20)
+    cache.put("abc", Converted("a.pdf", "# Title", images=[b"png"]), images=True)
+
+    assert cache.key("abc", images=True) != cache.key("abc")
+    assert cache.get("abc") is None
+    assert cache.get("abc", images=True).images == [b"png"]
+
+
+def test_entry_evicted_during_lookup_is_a_miss(tmp_path, monkeypatch):
+    cache = ParseCache(str(tmp_path), max_bytes=1 << 20)
+    cache.put("abc", Converted("a.pdf", "# Title"))
+
+    def evicted(path, times):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "utime", evicted)
+    assert cache.get("abc") is None
+    assert cache.stats()["misses"] == 1
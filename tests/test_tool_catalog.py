@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+
+from src.mcpws.servers.calculator_server import app
+from src.mcpws.utils.tool_catalog import ToolCatalogCache
+
+
+def test_tools_endpoint_answers_304_for_matching_etag():
+    c = TestClient(app)
+    first = c.get("/tools")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json()["tools"][0]["name"] == "calc.add"
+
+    again = c.get("/tools", headers={"If-None-Match": f"W/{etag}"})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == etag
+    assert c.get("/tools", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_catalog_cache_persists_to_disk(tmp_path):
+    path = str(tmp_path / "tools.json")
+    key = ToolCatalogCache.key("http://gw", "secret")
+    assert "secret" not in key
+
+    ToolCatalogCache(ttl_s=60, path=path).put(key, [{"name": "calc.add"}], '"v1"')
+    reloaded = ToolCatalogCache(ttl_s=60, path=path)
+    assert reloaded.fresh(key) == [{"name": "calc.add"}]
+    assert reloaded.get(key).etag == '"v1"'
+    assert ToolCatalogCache(ttl_s=0, path=path).fresh(key) is None  # expired: revalidate
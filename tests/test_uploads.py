@@ -0,0 +1,73 @@
+import asyncio
+import hashlib
+import os
+
+import httpx
+import pytest
+
+from src.mcpws.rag.uploads import spool_form, upload_name
+
+
+def _multipart(files, data=None):
+    request = httpx.Request("POST", "http://test/", files=files, data=data)
+    return request.read(), request.headers["content-type"]
+
+
+def _chunks(body, size, sent=None):
+    async def gen():
+        for i in range(0, len(body), size):
+            if sent is not None:
+                sent.append(i + size)
+            yield body[i : i + size]
+
+    return gen()
+
+
+def test_spool_form_streams_files_to_disk(tmp_path):
+    data = b"x" * 2500
+    body, content_type = _multipart(
+        [("files", ("dir/a.pdf", data)), ("files", ("b.md", b"# b"))], {"tenant": "acme"}
+    )
+    form = asyncio.run(
+        spool_form(_chunks(body, 1000), content_type, max_bytes=4096, directory=str(tmp_path))
+    )
+    a, b = form.files["files"]
+    assert form.fields == {"tenant": "acme"}
+    assert (a.filename, a.size, b.filename) == ("a.pdf", 2500, "b.md")
+    assert a.sha256 == hashlib.sha256(data).hexdigest()
+    assert a.path.endswith(".pdf")
+    with open(b.path, "rb") as fh:
+        assert fh.read() == b"# b"
+    form.remove()
+    assert not os.listdir(tmp_path)
+
+
+def test_spool_form_rejects_oversized_while_streaming(tmp_path):
+    body, content_type = _multipart([("file", ("big.pdf", b"x" * 50_000))])
+    sent = []
+    with pytest.raises(ValueError, match="big.pdf exceeds"):
+        asyncio.run(
+            spool_form(
+                _chunks(body, 1024, sent), content_type, max_bytes=2048, directory=str(tmp_path)
+            )
+        )
+    assert sent[-1] < 5 * 1024
+    assert not os.listdir(tmp_path)
+
+
+def test_spool_form_rejects_a_truncated_body(tmp_path):
+    body, content_type = _multipart([("file", ("a.pdf", b"x" * 5000))])
+    with pytest.raises(ValueError, match="Incomplete"):
+        asyncio.run(
+            spool_form(
+                _chunks(body[:3000], 1024), content_type, max_bytes=8192, directory=str(tmp_path)
+            )
+        )
+    assert not os.listdir(tmp_path)
+
+
+def test_upload_names_lose_their_directories():
+    assert upload_name("acme/a.md") == "a.md"
+    assert upload_name("C:\\docs\\b.pdf") == "b.pdf"
+    assert upload_name("../") == "upload"
+    assert upload_name(None) == "upload"